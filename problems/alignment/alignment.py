@@ -1,4 +1,30 @@
+import dataclasses
+import importlib
 import math
+import os
+import time
+import tracemalloc
+import warnings
+from functools import partial
+from typing import Iterable, Iterator, NamedTuple
+
+# Engines are imported the first time they are asked for,
+# so importing alignment (e.g. in every pool worker) only loads the backend in use
+ENGINE_MODULES = {
+    'python': 'alignment_compact',
+    'numpy': 'alignment_numpy',
+}
+_engines = {}
+
+
+def get_engine(name: str):
+    """The module implementing the named DP engine, imported on first use"""
+    if name not in _engines:
+        if name not in ENGINE_MODULES:
+            raise ValueError(f'Unknown alignment engine: {name}')
+        _engines[name] = importlib.import_module(ENGINE_MODULES[name])
+    return _engines[name]
+
 
 def get_banded_range(i, row_length, banded_width):
     if banded_width == -1:
@@ -13,60 +39,290 @@ def get_banded_range(i, row_length, banded_width):
         return range(lower, upper)
 
 def find_alignment_strings(matrix, left_string, right_string, gap):
-    left_alignment_string = ''
-    right_alignment_string = ''
-    current_cell = matrix[len(left_string), len(right_string)]
+    """
+    Trace the alignment strings back from the last cell.
+
+    matrix is either the compact engines' Backpointers or a dict of
+    (i, j) -> (cost, previous cell, direction). Characters are collected
+    into lists and reversed once, so the traceback is linear in the alignment length.
+    """
+    if not isinstance(matrix, dict):
+        return get_engine('python').traceback(matrix, left_string, right_string, gap)
+    left_chars = []
+    right_chars = []
+    i = len(left_string)
+    j = len(right_string)
+    current_cell = matrix[i, j]
     while current_cell[2] is not None:
         if current_cell[2] == 'diagonal':
-            left_alignment_string = left_string[-1] + left_alignment_string
-            left_string = left_string[:-1]
-            right_alignment_string = right_string[-1] + right_alignment_string
-            right_string = right_string[:-1]
+            i -= 1
+            j -= 1
+            left_chars.append(left_string[i])
+            right_chars.append(right_string[j])
         if current_cell[2] == 'left':
-            left_alignment_string = gap + left_alignment_string
-            right_alignment_string = right_string[-1] + right_alignment_string
-            right_string = right_string[:-1]
+            j -= 1
+            left_chars.append(gap)
+            right_chars.append(right_string[j])
         if current_cell[2] == 'up':
-            left_alignment_string = left_string[-1] + left_alignment_string
-            left_string = left_string[:-1]
-            right_alignment_string = gap + right_alignment_string
+            i -= 1
+            left_chars.append(left_string[i])
+            right_chars.append(gap)
         current_cell = matrix[current_cell[1]]
-    return left_alignment_string, right_alignment_string
+    return ''.join(reversed(left_chars)), ''.join(reversed(right_chars))
+
+def _as_str(seq) -> str:
+    """Sequences may arrive as bytes or memoryviews (see alignment_fasta)"""
+    if isinstance(seq, str):
+        return seq
+    return bytes(seq).decode('latin-1')
+
+
+@dataclasses.dataclass
+class AlignmentStats:
+    fill_time: float = 0
+    traceback_time: float = 0
+    # Time spent reading the input, filled in by main.py
+    io_time: float = 0
+    # Cells of the DP table that were evaluated (by the last fill, in adaptive mode)
+    cells: int | None = None
+    # cells as a fraction of the full (n + 1) x (m + 1) table
+    band_occupancy: float | None = None
+    # Peak bytes allocated while aligning, as seen by tracemalloc (profile='memory' only)
+    peak_memory: int | None = None
+
 
 def align(seq1: str, seq2: str, match_award=-3, indel_penalty=5, sub_penalty=1,
-          banded_width=-1, gap='-') -> tuple[float, str | None, str | None]:
-    mod_seq1 = "_" + seq1
-    mod_seq2 = "_" + seq2
-    len1 = len(mod_seq1)
-    len2 = len(mod_seq2)
-    matrix = {(0, 0): (0, None, None)}
-    for i in range(len1):
-        for j in get_banded_range(i, len2, banded_width):
-            if i == 0 and j == 0:
-                pass
-            elif i == 0:
-                matrix[(i,j)] = (j * indel_penalty, (i, j-1), 'left')
-            elif j == 0:
-                matrix[(i,j)] = (i * indel_penalty, (i-1, 0), 'up')
-            else:
-                diag_cost = sub_penalty + matrix[(i-1, j-1)][0]
-                if mod_seq1[i] == mod_seq2[j]:
-                    diag_cost = match_award + matrix[(i-1, j-1)][0]
-                left_cost = math.inf
-                if (i,j-1) in matrix:
-                    left_cost = indel_penalty + matrix[(i, j-1)][0]
-                up_cost = math.inf
-                if (i-1, j) in matrix:
-                    up_cost = indel_penalty + matrix[(i-1, j)][0]
-                if min(diag_cost, left_cost, up_cost) == diag_cost:
-                    matrix[(i,j)] = (diag_cost, (i-1, j-1), 'diagonal')
-                elif min(left_cost, up_cost) == left_cost:
-                    matrix[(i,j)] = (left_cost, (i, j-1), 'left')
-                else:
-                    matrix[(i,j)] = (up_cost, (i-1, j), 'up')
-    alignment_cost = matrix[(len1-1, len2-1)][0]
-    left_alignment_string, right_alignment_string = find_alignment_strings(matrix, seq1, seq2, gap)
+          banded_width=-1, gap='-', mode='full',
+          engine='python', gap_open=0, sub_matrix=None, profile: bool | str = False) -> tuple:
+    """
+    Globally align seq1 and seq2, returning the cost and the two alignment strings.
+    The sequences may be str or bytes-like.
+
+    The DP table is filled by the compact engine, which keeps two rows of costs
+    and a one byte backpointer per cell rather than a tuple per cell.
+    If the band does not reach the last cell there is no alignment: (inf, None, None).
+
+    sub_matrix gives the cost of aligning specific symbol pairs, either as
+    {(a, b): cost} or {a: {b: cost}}; pairs it leaves out use match_award/sub_penalty.
+
+    A nonzero gap_open uses affine gaps (Gotoh), where a run of L gaps costs
+    gap_open + L * indel_penalty. It is supported by the python engine, banded or not.
+
+    engine='numpy' fills the table with vectorized row operations instead of
+    a per-cell Python loop, with identical costs and tie-breaking (non-integer
+    scoring falls back to the python engine).
+
+    mode='linear_space' uses Hirschberg's algorithm instead, which finds an optimal
+    alignment in O(n + m) memory (ties may resolve to a different optimal alignment).
+
+    mode='adaptive' starts from banded_width and doubles the band until no path
+    outside of it can be cheaper, so the cost always matches the unbanded one.
+
+    mode='seed_extend' chains exact k-mer anchors and only aligns the stretches
+    between them (see alignment_seed), warning when the result may be suboptimal.
+
+    profile=True returns an AlignmentStats with per-phase timings and cell counts
+    as a fourth value. profile='memory' also records the peak memory with tracemalloc,
+    which makes the alignment many times slower, so its timings are not representative.
+    Modes without a separate traceback (linear_space, seed_extend) count all of
+    their time as fill_time.
+    """
+    if not profile:
+        return _align(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, gap,
+                      mode, engine, gap_open, sub_matrix)
+
+    stats = AlignmentStats()
+    if profile != 'memory':
+        return *_align(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, gap,
+                       mode, engine, gap_open, sub_matrix, stats), stats
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = _align(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, gap,
+                        mode, engine, gap_open, sub_matrix, stats)
+        stats.peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return *result, stats
+
+
+def _align(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, gap, mode,
+           engine, gap_open, sub_matrix, stats: AlignmentStats | None = None):
+    start = time.perf_counter()
+    seq1 = _as_str(seq1)
+    seq2 = _as_str(seq2)
+    if mode == 'linear_space':
+        if banded_width != -1:
+            raise ValueError('linear_space mode does not support banded_width')
+        if gap_open:
+            raise ValueError('linear_space mode does not support gap_open')
+        import alignment_hirschberg
+        result = alignment_hirschberg.hirschberg(
+            seq1, seq2, match_award, indel_penalty, sub_penalty, gap, sub_matrix)
+        if stats is not None:
+            stats.fill_time = time.perf_counter() - start
+        return result
+    if mode == 'seed_extend':
+        if gap_open or sub_matrix:
+            raise ValueError('seed_extend mode does not support gap_open or sub_matrix')
+        import alignment_seed
+        result = alignment_seed.seed_and_extend(
+            seq1, seq2, match_award=match_award, indel_penalty=indel_penalty,
+            sub_penalty=sub_penalty, banded_width=8 if banded_width == -1 else banded_width, gap=gap)
+        if result.maybe_suboptimal:
+            warnings.warn('seed_extend alignment was constrained to anchors and may be suboptimal',
+                          stacklevel=3)
+        if stats is not None:
+            stats.fill_time = time.perf_counter() - start
+        return result.score, result.aligned1, result.aligned2
+    if mode not in ('full', 'adaptive'):
+        raise ValueError(f'Unknown alignment mode: {mode}')
+
+    if gap_open and engine != 'python':
+        raise ValueError(f'The {engine} engine does not support gap_open')
+    fill = get_engine(engine).fill
+    if gap_open:
+        fill = partial(fill, gap_open=gap_open)
+    if sub_matrix:
+        fill = partial(fill, sub_matrix=sub_matrix)
+
+    if mode == 'adaptive':
+        import alignment_adaptive
+        alignment_cost, backpointers = alignment_adaptive.adaptive_fill(
+            fill, seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, sub_matrix)
+    else:
+        alignment_cost, backpointers = fill(
+            seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width)
+    if stats is not None:
+        stats.fill_time = time.perf_counter() - start
+        stats.cells = get_engine('python').band_cells(
+            backpointers.rows, backpointers.cols, backpointers.banded_width)
+        stats.band_occupancy = stats.cells / ((len(seq1) + 1) * (len(seq2) + 1))
+    if math.isinf(alignment_cost):
+        return alignment_cost, None, None
+    start = time.perf_counter()
+    left_alignment_string, right_alignment_string = find_alignment_strings(
+        backpointers, seq1, seq2, gap)
+    if stats is not None:
+        stats.traceback_time = time.perf_counter() - start
     return alignment_cost, left_alignment_string, right_alignment_string
 
 
-print(align('ctgcataaggtcagtcat', 'tacgcaggtcacggt', banded_width=-1))
+def _is_unit_cost(seq1, seq2, match_award, indel_penalty, sub_penalty,
+                  banded_width, gap_open, sub_matrix) -> bool:
+    return (match_award == 0 and sub_penalty == indel_penalty > 0
+            and not gap_open and not sub_matrix
+            and (banded_width == -1 or banded_width >= max(len(seq1), len(seq2))))
+
+
+def alignment_score(seq1: str, seq2: str, match_award=-3, indel_penalty=5, sub_penalty=1,
+                    banded_width=-1, gap_open=0, sub_matrix=None) -> float:
+    """
+    The cost align() would return, computed from rolling rows without a traceback.
+
+    Memory is O(min(n, m)) (or O(k) when banded), so this is cheap enough
+    to use as a prefilter before deciding which pairs deserve a full align().
+
+    Edit distance scoring (match 0, substitution = indel) is detected and handed
+    to the bit-parallel alignment_myers.edit_distance, scaled by the indel penalty.
+    """
+    seq1 = _as_str(seq1)
+    seq2 = _as_str(seq2)
+    if _is_unit_cost(seq1, seq2, match_award, indel_penalty, sub_penalty,
+                     banded_width, gap_open, sub_matrix):
+        import alignment_myers
+        return indel_penalty * alignment_myers.edit_distance(seq1, seq2)
+    return get_engine('python').score(
+        seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, gap_open, sub_matrix)
+
+
+class RegionAlignment(NamedTuple):
+    """A local or semi-global alignment of seq1[start1:end1] with seq2[start2:end2]"""
+    score: float
+    aligned1: str
+    aligned2: str
+    start1: int
+    end1: int
+    start2: int
+    end2: int
+
+
+def _align_region(seq1, seq2, kind, match_award, indel_penalty, sub_penalty,
+                  banded_width, gap, sub_matrix) -> RegionAlignment:
+    seq1 = _as_str(seq1)
+    seq2 = _as_str(seq2)
+    engine = get_engine('python')
+    cost, end, backpointers = engine.fill_region(
+        seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width, kind, sub_matrix)
+    end1, end2 = end
+    aligned1, aligned2, start1, start2 = engine.traceback_from(
+        backpointers, seq1, seq2, gap, end1, end2)
+    return RegionAlignment(cost, aligned1, aligned2, start1, end1, start2, end2)
+
+
+def align_local(seq1: str, seq2: str, match_award=-3, indel_penalty=5, sub_penalty=1,
+                banded_width=-1, gap='-', sub_matrix=None) -> RegionAlignment:
+    """
+    Smith-Waterman: the cheapest alignment between any substring of seq1
+    and any substring of seq2, with its coordinates in both sequences
+    """
+    return _align_region(seq1, seq2, 'local', match_award, indel_penalty, sub_penalty,
+                         banded_width, gap, sub_matrix)
+
+
+def align_semi_global(seq1: str, seq2: str, match_award=-3, indel_penalty=5, sub_penalty=1,
+                      banded_width=-1, gap='-', sub_matrix=None) -> RegionAlignment:
+    """
+    End-gap-free alignment: gaps before and after either sequence are free,
+    so a short read aligns in full to wherever it lands inside a long genome.
+    The result covers the overlapping region and its coordinates in both sequences.
+    """
+    return _align_region(seq1, seq2, 'semi_global', match_award, indel_penalty, sub_penalty,
+                         banded_width, gap, sub_matrix)
+
+
+def _align_pair(pair: tuple[str, str], **kwargs) -> tuple[float, str | None, str | None]:
+    return align(*pair, **kwargs)
+
+
+def _score_pair(pair: tuple[str, str], **kwargs) -> float:
+    return alignment_score(*pair, **kwargs)
+
+
+def align_many(pairs: Iterable[tuple[str, str]], workers: int | None = None,
+               chunksize: int | None = None, **kwargs) -> Iterator[tuple[float, str | None, str | None]]:
+    """
+    Align every (seq1, seq2) pair, yielding the results in input order.
+
+    Pairs are handed to a process pool in chunks so the per-task overhead is
+    amortized; keyword arguments (banded_width, scoring, mode, ...) go to align().
+    workers=1 runs in this process without a pool.
+    """
+    yield from _map_pairs(partial(_align_pair, **kwargs), pairs, workers, chunksize)
+
+
+def score_many(pairs: Iterable[tuple[str, str]], workers: int | None = None,
+               chunksize: int | None = None, **kwargs) -> Iterator[float]:
+    """Like align_many, but only the alignment_score() of each pair"""
+    yield from _map_pairs(partial(_score_pair, **kwargs), pairs, workers, chunksize)
+
+
+def _map_pairs(worker, pairs, workers, chunksize) -> Iterator:
+    if workers == 1:
+        yield from map(worker, pairs)
+        return
+
+    # memoryviews can't be pickled over to the workers
+    pairs = ((_as_str(seq1), _as_str(seq2)) for seq1, seq2 in pairs)
+
+    workers = workers or os.cpu_count() or 1
+    if chunksize is None:
+        pairs = list(pairs)
+        chunksize = max(1, len(pairs) // (workers * 4))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(worker, pairs, chunksize=chunksize)
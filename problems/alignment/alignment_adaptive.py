@@ -0,0 +1,42 @@
+import alignment_scoring
+
+
+def outside_band_bound(n, m, match_award, indel_penalty, sub_penalty, banded_width,
+                       sub_matrix=None) -> float:
+    """
+    A lower bound on the cost of any alignment path that leaves the band.
+
+    To reach diagonal offset k + 1 and come back to the final offset m - n a path
+    needs at least 2(k + 1) - |m - n| indels. A path with g indels has (n + m - g) / 2
+    diagonal steps, each costing at least the cheapest substitution. That cost is linear in g,
+    so its minimum over the feasible g is at one of the two ends.
+    """
+    cheapest_step = alignment_scoring.cheapest_substitution(match_award, sub_penalty, sub_matrix)
+
+    def cost(indels):
+        return indels * indel_penalty + (n + m - indels) / 2 * cheapest_step
+
+    fewest_indels = 2 * (banded_width + 1) - abs(n - m)
+    return min(cost(fewest_indels), cost(n + m))
+
+
+def adaptive_fill(fill, seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width=-1,
+                  sub_matrix=None):
+    """
+    Run fill() with a band that doubles until nothing outside of it could be cheaper.
+
+    fill is called as fill(seq1, seq2, match_award, indel_penalty, sub_penalty, k),
+    so any sub_matrix has to be bound into it already.
+    The band starts at banded_width (at least |n - m|, so the last cell is inside).
+    Once the banded cost is no more than outside_band_bound, it is optimal for the
+    whole table; a band as wide as the sequences is simply the unbanded fill.
+    """
+    n = len(seq1)
+    m = len(seq2)
+    k = max(banded_width, abs(n - m), 1)
+    while k < max(n, m):
+        cost, backpointers = fill(seq1, seq2, match_award, indel_penalty, sub_penalty, k)
+        if cost <= outside_band_bound(n, m, match_award, indel_penalty, sub_penalty, k, sub_matrix):
+            return cost, backpointers
+        k *= 2
+    return fill(seq1, seq2, match_award, indel_penalty, sub_penalty)
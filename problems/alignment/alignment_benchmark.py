@@ -0,0 +1,125 @@
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from alignment_compact import band_cells
+
+TEST_FILES = Path(__file__).parent / 'test_files'
+
+# Fixed scoring, so results stay comparable across versions
+SCORING = dict(match_award=-3, indel_penalty=5, sub_penalty=1)
+
+# name -> (sequence length, banded_width, expected alignment file prefix or None)
+CASES = {
+    'small': (300, -1, None),
+    'large': (3000, -1, 'large_bovine_murine_align'),
+    'large_banded': (3000, 3, 'large_banded_bovine_murine_align'),
+    'massive': (31000, 3, 'massive_bovine_murine_align'),
+}
+
+
+def read_sequence(file: Path) -> str:
+    return ''.join(file.read_text().splitlines())
+
+
+def run_case(name: str, engine: str, repeat: int) -> dict:
+    """Time one case; meant to run in its own process so peak RSS belongs to it alone"""
+    from alignment import align
+
+    length, banded_width, expected = CASES[name]
+    seq1 = read_sequence(TEST_FILES / 'bovine_coronavirus.txt')[:length]
+    seq2 = read_sequence(TEST_FILES / 'murine_hepatitus.txt')[:length]
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score, aligned1, aligned2 = align(seq1, seq2, banded_width=banded_width, engine=engine, **SCORING)
+        times.append(time.perf_counter() - start)
+
+    correct = None
+    if expected is not None:
+        correct = (aligned1 == (TEST_FILES / f'{expected}1.txt').read_text()
+                   and aligned2 == (TEST_FILES / f'{expected}2.txt').read_text())
+
+    best = min(times)
+    cells = band_cells(len(seq1) + 1, len(seq2) + 1, banded_width)
+    return {
+        'length': length,
+        'banded_width': banded_width,
+        'score': score,
+        'correct': correct,
+        'wall_time': best,
+        'cells': cells,
+        'cells_per_second': cells / best if best else None,
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                       / (1 << 20 if sys.platform == 'darwin' else 1 << 10),
+    }
+
+
+def run(cases: list[str], engine='python', repeat=1) -> dict:
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_case, name, engine, repeat).result()
+        print(format_result(name, results[name]), flush=True)
+    return {
+        'engine': engine,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'scoring': SCORING,
+        'cases': results,
+    }
+
+
+def format_result(name: str, result: dict) -> str:
+    return (f'{name}: {round(result["wall_time"], 4)} sec, '
+            f'{round(result["cells_per_second"] / 1e6, 2)} M cells/sec, '
+            f'{round(result["peak_rss_mb"], 1)} MB peak RSS, '
+            f'score {result["score"]}, correct {result["correct"]}')
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Cases that got slower than baseline * tolerance, or that no longer give the right answer"""
+    regressions = []
+    for name, result in results['cases'].items():
+        if name not in baseline['cases']:
+            continue
+        before = baseline['cases'][name]
+        ratio = result['wall_time'] / before['wall_time']
+        print(f'{name}: {round(ratio, 3)}x baseline time, '
+              f'{round(result["peak_rss_mb"] / before["peak_rss_mb"], 3)}x baseline RSS')
+        if ratio > tolerance:
+            regressions.append(f'{name} is {round(ratio, 3)}x slower than baseline')
+        if before['correct'] and not result['correct']:
+            regressions.append(f'{name} no longer matches the expected alignment')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser()
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--engine', default='python')
+    parser.add_argument('--repeat', type=int, default=1, help='Report the best of this many runs')
+    parser.add_argument('--output', type=Path, help='Write the results as JSON')
+    parser.add_argument('--baseline', type=Path, help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Fail if a case takes more than this multiple of its baseline time')
+    args = parser.parse_args()
+
+    results = run(args.cases, args.engine, args.repeat)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,108 @@
+import json
+import math
+import os
+import shutil
+from pathlib import Path
+
+import alignment_compact
+import alignment_scoring
+from alignment import _as_str
+
+# Files kept in the checkpoint directory
+SEQUENCES = ('seq1.txt', 'seq2.txt')
+BACKPOINTERS = 'backpointers.bin'
+STATE = 'state.json'
+
+
+def align_checkpointed(seq1: str, seq2: str, checkpoint_dir: Path | str, match_award=-3,
+                       indel_penalty=5, sub_penalty=1, banded_width=-1, gap='-',
+                       sub_matrix=None, every=1000) -> tuple[float, str | None, str | None]:
+    """
+    align(), but the row-wise fill is saved to checkpoint_dir every `every` rows,
+    so a run that is interrupted can carry on with resume(checkpoint_dir).
+
+    Backpointer rows are appended to a file as they are computed, and a checkpoint
+    (the cost row and how many backpointer rows are complete) is written to a
+    temporary file and moved into place, so a preempted process always leaves
+    the last complete checkpoint behind. The directory is removed once the
+    alignment is done. An existing checkpoint in checkpoint_dir is replaced.
+    """
+    checkpoint_dir = Path(checkpoint_dir)
+    seq1 = _as_str(seq1)
+    seq2 = _as_str(seq2)
+    n = len(seq1)
+    m = len(seq2)
+    if banded_width >= max(n, m):
+        banded_width = -1
+
+    if checkpoint_dir.exists():
+        shutil.rmtree(checkpoint_dir)
+    checkpoint_dir.mkdir(parents=True)
+    for name, seq in zip(SEQUENCES, (seq1, seq2)):
+        (checkpoint_dir / name).write_text(seq)
+    (checkpoint_dir / BACKPOINTERS).touch()
+    _save_state(checkpoint_dir, {
+        'match_award': match_award,
+        'indel_penalty': indel_penalty,
+        'sub_penalty': sub_penalty,
+        'banded_width': banded_width,
+        'gap': gap,
+        'sub_matrix': [[a, b, cost] for (a, b), cost in alignment_scoring.pair_costs(sub_matrix).items()],
+        'every': every,
+        'row': 0,
+        'prev': None,
+    })
+    return resume(checkpoint_dir)
+
+
+def resume(checkpoint_dir: Path | str) -> tuple[float, str | None, str | None]:
+    """Carry on the alignment saved in checkpoint_dir from its last checkpoint"""
+    checkpoint_dir = Path(checkpoint_dir)
+    state = json.loads((checkpoint_dir / STATE).read_text())
+    seq1, seq2 = ((checkpoint_dir / name).read_text() for name in SEQUENCES)
+    n = len(seq1)
+    m = len(seq2)
+    k = state['banded_width']
+    indel_penalty = state['indel_penalty']
+    sub_matrix = {(a, b): cost for a, b, cost in state['sub_matrix']}
+
+    if k != -1 and abs(n - m) > k:
+        shutil.rmtree(checkpoint_dir)
+        return math.inf, None, None
+
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, state['match_award'], state['sub_penalty'], sub_matrix)
+    if k == -1:
+        rows = alignment_compact.full_rows(codes1, codes2, table, indel_penalty,
+                                           state['row'], state['prev'])
+    else:
+        rows = alignment_compact.band_rows(codes1, codes2, table, indel_penalty, k,
+                                           state['row'], state['prev'])
+    backpointers = alignment_compact.Backpointers(n + 1, m + 1, k)
+
+    with open(checkpoint_dir / BACKPOINTERS, 'r+b') as file:
+        # Rows written after the last checkpoint are computed again
+        file.truncate(state['row'] * backpointers.width)
+        file.seek(0, os.SEEK_END)
+        for i, row, costs in rows:
+            file.write(row)
+            if (i + 1) % state['every'] == 0 and i < n:
+                file.flush()
+                os.fsync(file.fileno())
+                _save_state(checkpoint_dir, {**state, 'row': i + 1, 'prev': costs})
+
+    with open(checkpoint_dir / BACKPOINTERS, 'rb') as file:
+        file.readinto(backpointers.data)
+    score = costs[-1] if k == -1 else costs[m - n + k]
+    aligned1, aligned2 = alignment_compact.traceback(backpointers, seq1, seq2, state['gap'])
+    shutil.rmtree(checkpoint_dir)
+    return score, aligned1, aligned2
+
+
+def _save_state(checkpoint_dir: Path, state: dict):
+    temporary = checkpoint_dir / (STATE + '.tmp')
+    with open(temporary, 'w') as file:
+        json.dump(state, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, checkpoint_dir / STATE)
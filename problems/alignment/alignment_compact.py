@@ -0,0 +1,512 @@
+import math
+from typing import Iterator
+
+import alignment_scoring
+
+# Backpointer codes, one byte per DP cell
+START = 0
+DIAGONAL = 1
+LEFT = 2
+UP = 3
+
+
+class Backpointers:
+    """
+    The traceback directions of a DP fill, stored one byte per cell
+    in a flat bytearray instead of a (cost, (i, j), direction) tuple per cell.
+
+    Banded tables only store the 2k + 1 cells of each row that are inside the band,
+    with cell (i, j) at offset j - i + k of row i.
+
+    Affine tables pack four 2-bit codes into each byte: the cheapest state of the cell
+    (bits 0-1), then the predecessor state of the diagonal, left and up states.
+    """
+
+    def __init__(self, rows: int, cols: int, banded_width: int = -1, affine: bool = False):
+        self.rows = rows
+        self.cols = cols
+        self.banded_width = banded_width
+        self.affine = affine
+        self.width = cols if banded_width == -1 else 2 * banded_width + 1
+        self.data = bytearray(rows * self.width)
+
+    def __getitem__(self, cell: tuple[int, int]) -> int:
+        i, j = cell
+        if self.banded_width == -1:
+            return self.data[i * self.width + j]
+        return self.data[i * self.width + j - i + self.banded_width]
+
+    def set_row(self, i: int, row: bytearray):
+        self.data[i * self.width:(i + 1) * self.width] = row
+
+
+def band_limits(i: int, row_length: int, banded_width: int) -> tuple[int, int]:
+    """Inclusive (lower, upper) columns of row i that are inside the band"""
+    if banded_width == -1:
+        return 0, row_length - 1
+    return max(0, i - banded_width), min(row_length - 1, i + banded_width)
+
+
+def band_cells(rows: int, cols: int, banded_width: int) -> int:
+    """Number of cells of a rows x cols table inside the band (all of them when unbanded)"""
+    if banded_width == -1:
+        return rows * cols
+    return sum(hi - lo + 1 for lo, hi in (band_limits(i, cols, banded_width) for i in range(rows)))
+
+
+def fill(seq1, seq2, match_award, indel_penalty, sub_penalty,
+         banded_width=-1, gap_open=0, sub_matrix=None) -> tuple[float, Backpointers]:
+    """
+    Fill the DP table for seq1 (rows) against seq2 (columns).
+
+    Only two rows of costs are kept; the traceback lives in the Backpointers.
+    Ties are broken the same way as the original dict based matrix:
+    diagonal, then left, then up. Cells outside of the band cost math.inf.
+
+    A nonzero gap_open switches to affine gaps, where a gap of length L
+    costs gap_open + L * indel_penalty.
+
+    The sequences are encoded to symbol codes once, and the cost of each
+    diagonal step is a lookup in the substitution table (see alignment_scoring).
+    """
+    n = len(seq1)
+    m = len(seq2)
+    if banded_width >= max(n, m):
+        banded_width = -1
+    if banded_width != -1 and abs(n - m) > banded_width:
+        return math.inf, Backpointers(0, m + 1, banded_width, affine=bool(gap_open))
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, match_award, sub_penalty, sub_matrix)
+    if gap_open:
+        return _fill_affine(codes1, codes2, table, indel_penalty, gap_open, banded_width)
+    if banded_width == -1:
+        return _fill_full(codes1, codes2, table, indel_penalty)
+    return _fill_band(codes1, codes2, table, indel_penalty, banded_width)
+
+
+def _fill_full(codes1, codes2, table, indel_penalty) -> tuple[float, Backpointers]:
+    backpointers = Backpointers(len(codes1) + 1, len(codes2) + 1)
+    for i, row, costs in full_rows(codes1, codes2, table, indel_penalty):
+        backpointers.set_row(i, row)
+    return costs[-1], backpointers
+
+
+def full_rows(codes1, codes2, table, indel_penalty, start=0,
+              prev: list | None = None) -> Iterator[tuple[int, bytearray, list]]:
+    """
+    Yield (i, backpointer row, cost row) for each row of the unbanded table.
+    To pick up where an earlier fill stopped, pass the first row to compute
+    as start and the cost row before it as prev.
+    """
+    cols = len(codes2) + 1
+    if start == 0:
+        prev = [j * indel_penalty for j in range(cols)]
+        first_row = bytearray([LEFT]) * cols
+        first_row[0] = START
+        yield 0, first_row, prev
+        start = 1
+
+    for i in range(start, len(codes1) + 1):
+        costs = table[codes1[i - 1]]
+        row = bytearray(cols)
+        row[0] = UP
+        left = i * indel_penalty
+        cur = [left]
+        for j, (b, diag, up) in enumerate(zip(codes2, prev, prev[1:]), 1):
+            diag += costs[b]
+            up += indel_penalty
+            left += indel_penalty
+            if diag <= left and diag <= up:
+                left = diag
+                row[j] = DIAGONAL
+            elif left <= up:
+                row[j] = LEFT
+            else:
+                left = up
+                row[j] = UP
+            cur.append(left)
+        yield i, row, cur
+        prev = cur
+
+
+def _fill_band(codes1, codes2, table, indel_penalty, banded_width) -> tuple[float, Backpointers]:
+    n = len(codes1)
+    m = len(codes2)
+    backpointers = Backpointers(n + 1, m + 1, banded_width)
+    for i, row, costs in band_rows(codes1, codes2, table, indel_penalty, banded_width):
+        backpointers.set_row(i, row)
+    return costs[m - n + banded_width], backpointers
+
+
+def band_rows(codes1, codes2, table, indel_penalty, banded_width, start=0,
+              prev: list | None = None) -> Iterator[tuple[int, bytearray, list]]:
+    """Like full_rows, with rows indexed by diagonal offset (see _band_score)"""
+    n = len(codes1)
+    m = len(codes2)
+    k = banded_width
+    width = 2 * k + 1
+
+    if start == 0:
+        prev = [math.inf] * (width + 1)
+        first_row = bytearray(width)
+        for j in range(1, min(k, m) + 1):
+            prev[j + k] = j * indel_penalty
+            first_row[j + k] = LEFT
+        prev[k] = 0
+        yield 0, first_row, prev
+        start = 1
+
+    for i in range(start, n + 1):
+        cur = [math.inf] * (width + 1)
+        row = bytearray(width)
+        lo = max(0, i - k)
+        hi = min(m, i + k)
+        left = math.inf
+        if lo == 0:
+            left = cur[k - i] = i * indel_penalty
+            row[k - i] = UP
+            lo = 1
+        costs = table[codes1[i - 1]]
+        for t in range(lo - i + k, hi - i + k + 1):
+            diag = prev[t] + costs[codes2[t + i - k - 1]]
+            up = prev[t + 1] + indel_penalty
+            left += indel_penalty
+            if diag <= left and diag <= up:
+                left = diag
+                row[t] = DIAGONAL
+            elif left <= up:
+                row[t] = LEFT
+            else:
+                left = up
+                row[t] = UP
+            cur[t] = left
+        yield i, row, cur
+        prev = cur
+
+
+def _fill_affine(codes1, codes2, table, indel_penalty, gap_open, banded_width,
+                 keep_backpointers=True) -> tuple[float, Backpointers]:
+    """
+    Gotoh's three state fill: M ends in a diagonal step, X in a left step
+    and Y in an up step. Opening a gap from another state costs gap_open + indel_penalty,
+    extending one costs indel_penalty. Every choice prefers M, then X, then Y,
+    so gap_open=0 reproduces the linear gap alignment exactly.
+
+    Rows are indexed by column when unbanded and by diagonal offset when banded;
+    each row has a trailing inf slot that stands in for cells outside of the band.
+    """
+    n = len(codes1)
+    m = len(codes2)
+    k = banded_width
+    inf = math.inf
+    backpointers = Backpointers(n + 1 if keep_backpointers else 0, m + 1, k, affine=True)
+    width = m + 1 if k == -1 else 2 * k + 1
+    opening = gap_open + indel_penalty
+
+    # Column j of row i is at j - shift; the previous row is `above` cells over
+    shift = 0 if k == -1 else -k
+    above = 0 if k == -1 else 1
+
+    diag_costs = [inf] * (width + 1)
+    left_costs = [inf] * (width + 1)
+    up_costs = [inf] * (width + 1)
+    row = bytearray(width)
+    diag_costs[-shift] = 0
+    for j in range(1, band_limits(0, m + 1, k)[1] + 1):
+        left_costs[j - shift] = gap_open + j * indel_penalty
+        row[j - shift] = LEFT | (DIAGONAL if j == 1 else LEFT) << 4
+    if keep_backpointers:
+        backpointers.set_row(0, row)
+
+    for i in range(1, n + 1):
+        if k != -1:
+            shift = i - k
+        cur_diag = [inf] * (width + 1)
+        cur_left = [inf] * (width + 1)
+        cur_up = [inf] * (width + 1)
+        row = bytearray(width)
+        lo, hi = band_limits(i, m + 1, k)
+        if lo == 0:
+            cur_up[-shift] = gap_open + i * indel_penalty
+            row[-shift] = UP | (DIAGONAL if i == 1 else UP) << 6
+            lo = 1
+
+        costs = table[codes1[i - 1]]
+        for j in range(lo, hi + 1):
+            t = j - shift
+
+            d = t - 1 + above
+            from_diag, from_left, from_up = diag_costs[d], left_costs[d], up_costs[d]
+            if from_diag <= from_left and from_diag <= from_up:
+                diag, code = from_diag, DIAGONAL << 2
+            elif from_left <= from_up:
+                diag, code = from_left, LEFT << 2
+            else:
+                diag, code = from_up, UP << 2
+            diag += costs[codes2[j - 1]]
+
+            from_diag = cur_diag[t - 1] + opening
+            from_left = cur_left[t - 1] + indel_penalty
+            from_up = cur_up[t - 1] + opening
+            if from_diag <= from_left and from_diag <= from_up:
+                left, code = from_diag, code | DIAGONAL << 4
+            elif from_left <= from_up:
+                left, code = from_left, code | LEFT << 4
+            else:
+                left, code = from_up, code | UP << 4
+
+            u = t + above
+            from_diag = diag_costs[u] + opening
+            from_left = left_costs[u] + opening
+            from_up = up_costs[u] + indel_penalty
+            if from_diag <= from_left and from_diag <= from_up:
+                up, code = from_diag, code | DIAGONAL << 6
+            elif from_left <= from_up:
+                up, code = from_left, code | LEFT << 6
+            else:
+                up, code = from_up, code | UP << 6
+
+            if diag <= left and diag <= up:
+                code |= DIAGONAL
+            elif left <= up:
+                code |= LEFT
+            else:
+                code |= UP
+            cur_diag[t] = diag
+            cur_left[t] = left
+            cur_up[t] = up
+            row[t] = code
+
+        if keep_backpointers:
+            backpointers.set_row(i, row)
+        diag_costs, left_costs, up_costs = cur_diag, cur_left, cur_up
+
+    t = m - shift
+    return min(diag_costs[t], left_costs[t], up_costs[t]), backpointers
+
+
+def fill_region(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width=-1,
+                kind='local', sub_matrix=None) -> tuple[float, tuple[int, int], Backpointers]:
+    """
+    Fill the DP table for a local (Smith-Waterman) or semi-global alignment.
+
+    Both start for free from any cell of the first row or column.
+    kind='local' also restarts (START, cost 0) wherever every move would cost 0 or more,
+    and ends at the cheapest cell anywhere in the table.
+    kind='semi_global' ends at the cheapest cell of the last row or column,
+    so gaps before and after either sequence are free.
+
+    Returns the cost, the cell the alignment ends at, and the backpointers.
+    Ties go to the first cell in row order; moves prefer diagonal, then left, then up.
+    """
+    if kind not in ('local', 'semi_global'):
+        raise ValueError(f'Unknown alignment kind: {kind}')
+    local = kind == 'local'
+    n = len(seq1)
+    m = len(seq2)
+    k = -1 if banded_width >= max(n, m) else banded_width
+    inf = math.inf
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, match_award, sub_penalty, sub_matrix)
+    backpointers = Backpointers(n + 1, m + 1, k)
+    width = backpointers.width
+
+    # Column j of row i is at j - shift; the previous row is `above` cells over
+    shift = 0 if k == -1 else -k
+    above = 0 if k == -1 else 1
+
+    prev = [inf] * (width + 1)
+    for j in range(band_limits(0, m + 1, k)[1] + 1):
+        prev[j - shift] = 0
+    best, end = (0, (0, 0)) if local else (inf, None)
+    if not local and band_limits(0, m + 1, k)[1] == m:
+        best, end = 0, (0, m)
+
+    for i in range(1, n + 1):
+        if k != -1:
+            shift = i - k
+        cur = [inf] * (width + 1)
+        row = bytearray(width)
+        lo, hi = band_limits(i, m + 1, k)
+        left = inf
+        if lo == 0:
+            left = cur[-shift] = 0
+            lo = 1
+            if i == n and not local and 0 < best:
+                best, end = 0, (n, 0)
+
+        costs = table[codes1[i - 1]]
+        for j in range(lo, hi + 1):
+            t = j - shift
+            diag = prev[t - 1 + above] + costs[codes2[j - 1]]
+            up = prev[t + above] + indel_penalty
+            left += indel_penalty
+            if local and diag >= 0 and left >= 0 and up >= 0:
+                left = 0
+            elif diag <= left and diag <= up:
+                left = diag
+                row[t] = DIAGONAL
+            elif left <= up:
+                row[t] = LEFT
+            else:
+                left = up
+                row[t] = UP
+            cur[t] = left
+            if left < best and (local or i == n or j == m):
+                best, end = left, (i, j)
+
+        backpointers.set_row(i, row)
+        prev = cur
+
+    return best, end, backpointers
+
+
+def traceback(backpointers: Backpointers, seq1, seq2, gap: str) -> tuple[str, str]:
+    """Walk the backpointers from the last cell, collecting characters in reverse"""
+    if backpointers.affine:
+        return _traceback_affine(backpointers, seq1, seq2, gap)
+    left, right, _, _ = traceback_from(backpointers, seq1, seq2, gap, len(seq1), len(seq2))
+    return left, right
+
+
+def traceback_from(backpointers: Backpointers, seq1, seq2, gap: str,
+                   i: int, j: int) -> tuple[str, str, int, int]:
+    """
+    Walk the backpointers from cell (i, j) back to a START cell.
+    Returns the alignment strings and the cell where the walk stopped.
+    """
+    left_chars = []
+    right_chars = []
+    direction = backpointers[i, j]
+    while direction != START:
+        if direction == DIAGONAL:
+            i -= 1
+            j -= 1
+            left_chars.append(seq1[i])
+            right_chars.append(seq2[j])
+        elif direction == LEFT:
+            j -= 1
+            left_chars.append(gap)
+            right_chars.append(seq2[j])
+        else:
+            i -= 1
+            left_chars.append(seq1[i])
+            right_chars.append(gap)
+        direction = backpointers[i, j]
+    return ''.join(reversed(left_chars)), ''.join(reversed(right_chars)), i, j
+
+
+def _traceback_affine(backpointers: Backpointers, seq1, seq2, gap: str) -> tuple[str, str]:
+    left_chars = []
+    right_chars = []
+    i = len(seq1)
+    j = len(seq2)
+    state = backpointers[i, j] & 3
+    while i or j:
+        cell = backpointers[i, j]
+        if state == DIAGONAL:
+            state = (cell >> 2) & 3
+            i -= 1
+            j -= 1
+            left_chars.append(seq1[i])
+            right_chars.append(seq2[j])
+        elif state == LEFT:
+            state = (cell >> 4) & 3
+            j -= 1
+            left_chars.append(gap)
+            right_chars.append(seq2[j])
+        else:
+            state = cell >> 6
+            i -= 1
+            left_chars.append(seq1[i])
+            right_chars.append(gap)
+    return ''.join(reversed(left_chars)), ''.join(reversed(right_chars))
+
+
+def last_row(seq1, seq2, match_award, indel_penalty, sub_penalty, sub_matrix=None) -> list[float]:
+    """
+    Costs of aligning all of seq1 against every prefix of seq2,
+    computed with two rolling rows and no backpointers
+    """
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, match_award, sub_penalty, sub_matrix)
+    return _last_row(codes1, codes2, table, indel_penalty)
+
+
+def _last_row(codes1, codes2, table, indel_penalty) -> list[float]:
+    prev = [j * indel_penalty for j in range(len(codes2) + 1)]
+    for i, a in enumerate(codes1, 1):
+        costs = table[a]
+        left = i * indel_penalty
+        cur = [left]
+        for b, diag, up in zip(codes2, prev, prev[1:]):
+            diag += costs[b]
+            up += indel_penalty
+            left += indel_penalty
+            if diag < left:
+                left = diag
+            if up < left:
+                left = up
+            cur.append(left)
+        prev = cur
+    return prev
+
+
+def score(seq1, seq2, match_award, indel_penalty, sub_penalty, banded_width=-1,
+          gap_open=0, sub_matrix=None) -> float:
+    """
+    The optimal alignment cost without a traceback.
+
+    Unbanded, the rolling rows run along the shorter sequence, so memory is O(min(n, m)).
+    Banded, each row only holds the 2k + 1 cells of the band, indexed by diagonal offset.
+    """
+    if banded_width >= max(len(seq1), len(seq2)):
+        banded_width = -1
+    if banded_width != -1 and abs(len(seq1) - len(seq2)) > banded_width:
+        return math.inf
+    if banded_width == -1 and len(seq2) > len(seq1):
+        seq1, seq2 = seq2, seq1
+        sub_matrix = alignment_scoring.transpose(sub_matrix)
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, match_award, sub_penalty, sub_matrix)
+    if gap_open:
+        return _fill_affine(codes1, codes2, table, indel_penalty, gap_open,
+                            banded_width, keep_backpointers=False)[0]
+    if banded_width == -1:
+        return _last_row(codes1, codes2, table, indel_penalty)[-1]
+    return _band_score(codes1, codes2, table, indel_penalty, banded_width)
+
+
+def _band_score(codes1, codes2, table, indel_penalty, banded_width) -> float:
+    n = len(codes1)
+    m = len(codes2)
+    k = banded_width
+
+    # Cell (i, j) lives at offset j - i + k of its row, so the diagonal neighbour
+    # has the same offset in the previous row, and the cell above is one to the right.
+    # The extra slot at the end stays inf and stands in for the cell above the band.
+    width = 2 * k + 1
+    prev = [math.inf] * (width + 1)
+    for j in range(min(k, m) + 1):
+        prev[j + k] = j * indel_penalty
+
+    for i in range(1, n + 1):
+        cur = [math.inf] * (width + 1)
+        lo = max(0, i - k)
+        hi = min(m, i + k)
+        left = math.inf
+        if lo == 0:
+            left = cur[k - i] = i * indel_penalty
+            lo = 1
+        costs = table[codes1[i - 1]]
+        for t in range(lo - i + k, hi - i + k + 1):
+            diag = prev[t] + costs[codes2[t + i - k - 1]]
+            up = prev[t + 1] + indel_penalty
+            left += indel_penalty
+            if diag < left:
+                left = diag
+            if up < left:
+                left = up
+            cur[t] = left
+        prev = cur
+    return prev[m - n + k]
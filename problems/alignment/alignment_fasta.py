@@ -0,0 +1,103 @@
+import mmap
+from itertools import chain
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+
+class Record(NamedTuple):
+    name: str
+    # A memoryview into the mapped file when the sequence is on one line,
+    # otherwise the lines joined into bytes (the only copy made)
+    sequence: bytes | memoryview
+
+
+def read_records(path: Path | str) -> Iterator[Record]:
+    """
+    Stream the records of a FASTA (>), FASTQ (@) or plain sequence file.
+
+    The file is memory-mapped, so only the pages a record touches are read,
+    and records come out one at a time. A plain file (no header line) is
+    one record named after the file, with its line breaks removed.
+    """
+    path = Path(path)
+    with open(path, 'rb') as file:
+        if path.stat().st_size == 0:
+            return
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    lines = _lines(mapped)
+    # The format is told by the first non-empty line, which goes back in front
+    first = next(lines, None)
+    if first is not None:
+        lines = chain([first], lines)
+    if first is not None and first[0] == ord('>'):
+        yield from _fasta_records(lines)
+    elif first is not None and first[0] == ord('@'):
+        yield from _fastq_records(lines)
+    else:
+        yield Record(path.stem, _join(list(lines)))
+
+    try:
+        mapped.close()
+    except BufferError:
+        # Records still hold views into the map; it is closed once they are released
+        pass
+
+
+def _lines(mapped: mmap.mmap) -> Iterator[memoryview]:
+    """Non-empty lines as views into the map, without their line endings"""
+    view = memoryview(mapped)
+    size = len(mapped)
+    start = 0
+    while start < size:
+        end = mapped.find(b'\n', start)
+        if end == -1:
+            end = size
+        stop = end - 1 if end > start and mapped[end - 1] == ord('\r') else end
+        if stop > start:
+            yield view[start:stop]
+        start = end + 1
+
+
+def _join(lines: list[memoryview]) -> bytes | memoryview:
+    if len(lines) == 1:
+        return lines[0]
+    return b''.join(lines)
+
+
+def _name(header: memoryview) -> str:
+    return bytes(header[1:]).decode('latin-1').strip()
+
+
+def _fasta_records(lines: Iterator[memoryview]) -> Iterator[Record]:
+    name = None
+    sequence_lines = []
+    for line in lines:
+        if line[0] == ord('>'):
+            if name is not None:
+                yield Record(name, _join(sequence_lines))
+            name = _name(line)
+            sequence_lines = []
+        else:
+            sequence_lines.append(line)
+    if name is not None:
+        yield Record(name, _join(sequence_lines))
+
+
+def _fastq_records(lines: Iterator[memoryview]) -> Iterator[Record]:
+    # @name, sequence line(s), +[name], quality line(s) covering the same length
+    for header in lines:
+        sequence_lines = []
+        for line in lines:
+            if line[0] == ord('+'):
+                break
+            sequence_lines.append(line)
+        sequence = _join(sequence_lines)
+        quality_length = 0
+        while quality_length < len(sequence):
+            line = next(lines, None)
+            if line is None:
+                raise ValueError(f'FASTQ record {_name(header)!r} is truncated: '
+                                 f'{quality_length} of {len(sequence)} quality values')
+            quality_length += len(line)
+        yield Record(_name(header), sequence)
@@ -0,0 +1,46 @@
+import alignment_compact
+
+# Subproblems with at most this many cells are solved with a full backpointer table
+BASE_CASE_CELLS = 1 << 16
+
+
+def hirschberg(seq1, seq2, match_award, indel_penalty, sub_penalty,
+               gap, sub_matrix=None) -> tuple[float, str, str]:
+    """
+    Hirschberg's divide and conquer alignment in O(n + m) memory.
+
+    seq1 is split in half, and the column where an optimal path crosses the
+    middle row is found from a forward pass over the top half and a reverse
+    pass over the bottom half. Each side is then solved independently.
+    """
+    left_parts = []
+    right_parts = []
+    cost = _hirschberg(seq1, seq2, match_award, indel_penalty, sub_penalty,
+                       gap, sub_matrix, left_parts, right_parts)
+    return cost, ''.join(left_parts), ''.join(right_parts)
+
+
+def _hirschberg(seq1, seq2, match_award, indel_penalty, sub_penalty,
+                gap, sub_matrix, left_parts, right_parts) -> float:
+    n = len(seq1)
+    m = len(seq2)
+    if n <= 1 or m <= 1 or n * m <= BASE_CASE_CELLS:
+        cost, backpointers = alignment_compact.fill(
+            seq1, seq2, match_award, indel_penalty, sub_penalty, sub_matrix=sub_matrix)
+        left, right = alignment_compact.traceback(backpointers, seq1, seq2, gap)
+        left_parts.append(left)
+        right_parts.append(right)
+        return cost
+
+    mid = n // 2
+    forward = alignment_compact.last_row(
+        seq1[:mid], seq2, match_award, indel_penalty, sub_penalty, sub_matrix)
+    backward = alignment_compact.last_row(
+        seq1[mid:][::-1], seq2[::-1], match_award, indel_penalty, sub_penalty, sub_matrix)
+    split = min(range(m + 1), key=lambda j: forward[j] + backward[m - j])
+    del forward, backward
+
+    return (_hirschberg(seq1[:mid], seq2[:split], match_award, indel_penalty,
+                        sub_penalty, gap, sub_matrix, left_parts, right_parts)
+            + _hirschberg(seq1[mid:], seq2[split:], match_award, indel_penalty,
+                          sub_penalty, gap, sub_matrix, left_parts, right_parts))
@@ -0,0 +1,93 @@
+import math
+
+import alignment_compact
+import alignment_scoring
+from alignment import _as_str
+
+
+class IncrementalAligner:
+    """
+    Keeps the DP state of one alignment so that editing seq1 only recomputes
+    the rows after the edit.
+
+    seq1 (the query that gets edited) runs down the rows and seq2 (the reference)
+    along the columns, so row i depends only on seq1[:i]. The backpointers of
+    every row and the cost row of every `stride`-th row are kept; after an edit,
+    the fill restarts from the last saved cost row before the first changed
+    position, and the cost of an update is (rows after the edit + stride) * len(seq2).
+
+    Results are the same as align(seq1, seq2, ...) with the same arguments.
+    """
+
+    def __init__(self, seq1: str, seq2: str, match_award=-3, indel_penalty=5, sub_penalty=1,
+                 banded_width=-1, gap='-', sub_matrix=None, stride=64):
+        self.seq2 = _as_str(seq2)
+        self.match_award = match_award
+        self.indel_penalty = indel_penalty
+        self.sub_penalty = sub_penalty
+        self.banded_width = banded_width
+        self.gap = gap
+        self.sub_matrix = sub_matrix
+        self.stride = stride
+
+        self.seq1 = ''
+        self.score = math.inf
+        self.rows_computed = 0
+        self._backpointers = alignment_compact.Backpointers(0, len(self.seq2) + 1, banded_width)
+        # row index -> cost row, for every stride-th row
+        self._cost_rows = {}
+        self.update(seq1)
+
+    def update(self, seq1: str) -> tuple[float, str | None, str | None]:
+        """Replace seq1 with an edited copy and return the new alignment"""
+        seq1 = _as_str(seq1)
+        n = len(seq1)
+        m = len(self.seq2)
+        k = self.banded_width
+
+        unchanged = 0
+        for a, b in zip(self.seq1, seq1):
+            if a != b:
+                break
+            unchanged += 1
+        self.seq1 = seq1
+
+        # Rows 0..unchanged only depend on the common prefix
+        start = unchanged // self.stride * self.stride
+        prev = self._cost_rows.get(start)
+        if prev is None:
+            start = 0
+        self._cost_rows = {i: row for i, row in self._cost_rows.items() if i <= start}
+        if start:
+            start += 1
+        backpointers = self._backpointers
+        del backpointers.data[start * backpointers.width:]
+
+        if k != -1 and abs(n - m) > k:
+            self.score = math.inf
+            self.rows_computed = 0
+            return self.alignment()
+
+        codes1, codes2, table = alignment_scoring.encode_pair(
+            seq1, self.seq2, self.match_award, self.sub_penalty, self.sub_matrix)
+        if k == -1:
+            rows = alignment_compact.full_rows(codes1, codes2, table, self.indel_penalty, start, prev)
+        else:
+            rows = alignment_compact.band_rows(codes1, codes2, table, self.indel_penalty, k, start, prev)
+
+        backpointers.rows = n + 1
+        costs = prev
+        for i, row, costs in rows:
+            backpointers.set_row(i, row)
+            if i % self.stride == 0:
+                self._cost_rows[i] = costs
+        self.rows_computed = n + 1 - start
+        self.score = costs[-1] if k == -1 else costs[m - n + k]
+        return self.alignment()
+
+    def alignment(self) -> tuple[float, str | None, str | None]:
+        if self.score == math.inf:
+            return math.inf, None, None
+        aligned1, aligned2 = alignment_compact.traceback(
+            self._backpointers, self.seq1, self.seq2, self.gap)
+        return self.score, aligned1, aligned2
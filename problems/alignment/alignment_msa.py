@@ -0,0 +1,167 @@
+from collections import Counter
+from itertools import combinations
+
+import alignment_compact
+import alignment_scoring
+from alignment import _as_str, score_many
+
+# A guide tree is a sequence index (leaf) or a (left, right) pair of subtrees
+GuideTree = int | tuple
+
+
+def pairwise_scores(sequences: list[str], match_award=-3, indel_penalty=5, sub_penalty=1,
+                    sub_matrix=None, workers: int | None = None,
+                    cache: dict | None = None) -> dict[tuple[int, int], float]:
+    """
+    The alignment_score of every pair (i < j) of sequences.
+
+    The pairs missing from cache are scored in parallel with score_many. Passing
+    the same cache dict ((seq1, seq2, scoring) -> score) to later calls means
+    adding one sequence to a set only scores the new pairs; the cache keeps every
+    sequence it has seen alive, so by default none is kept.
+    """
+    if cache is None:
+        cache = {}
+    scoring = (match_award, indel_penalty, sub_penalty,
+               tuple(sorted(alignment_scoring.pair_costs(sub_matrix).items())))
+    keys = {(i, j): (sequences[i], sequences[j], scoring)
+            for i, j in combinations(range(len(sequences)), 2)}
+    missing = sorted({key for key in keys.values() if key not in cache})
+    scores = score_many(((seq1, seq2) for seq1, seq2, _ in missing), workers=workers,
+                        match_award=match_award, indel_penalty=indel_penalty,
+                        sub_penalty=sub_penalty, sub_matrix=sub_matrix)
+    cache.update(zip(missing, scores))
+    return {pair: cache[key] for pair, key in keys.items()}
+
+
+def distances(sequences: list[str], scores: dict[tuple[int, int], float], match_award=-3,
+              sub_penalty=1, sub_matrix=None) -> dict[tuple[int, int], float]:
+    """
+    How much worse each pair scores than the two sequences score against themselves
+    on average, so identical sequences are at distance 0 whatever their length
+    """
+    own = []
+    for seq in sequences:
+        codes, _, table = alignment_scoring.encode_pair(seq, seq, match_award, sub_penalty, sub_matrix)
+        own.append(sum(table[code][code] for code in codes))
+    return {(i, j): score - (own[i] + own[j]) / 2 for (i, j), score in scores.items()}
+
+
+def upgma(count: int, distances: dict[tuple[int, int], float]) -> GuideTree:
+    """
+    Join the two closest clusters until one is left; the distance to a joined
+    cluster is the size weighted average of the distances to its two halves
+    """
+    clusters = {i: (i, 1) for i in range(count)}
+    distance = dict(distances)
+    next_id = count
+    while len(clusters) > 1:
+        a, b = min(distance, key=distance.__getitem__)
+        (tree_a, size_a), (tree_b, size_b) = clusters.pop(a), clusters.pop(b)
+        for c in clusters:
+            distance[min(c, next_id), max(c, next_id)] = (
+                size_a * distance[min(a, c), max(a, c)] + size_b * distance[min(b, c), max(b, c)]
+            ) / (size_a + size_b)
+        distance = {pair: d for pair, d in distance.items() if a not in pair and b not in pair}
+        clusters[next_id] = ((tree_a, tree_b), size_a + size_b)
+        next_id += 1
+    return next(iter(clusters.values()))[0]
+
+
+def align_profiles(profile1: list[str], profile2: list[str], match_award=-3, indel_penalty=5,
+                   sub_penalty=1, gap='-', sub_matrix=None) -> list[str]:
+    """
+    Align two profiles (lists of equal length aligned rows) column against column
+    and return the rows of both, with gap columns inserted where needed.
+
+    Two columns cost the average cost over every pair of their symbols (a gap
+    against a symbol costs indel_penalty, two gaps cost nothing); inserting a gap
+    column costs indel_penalty. Columns are reduced to their symbol counts, so
+    each distinct pair of columns is costed once, and the DP is alignment_compact's.
+    """
+    columns1, kinds1 = _column_kinds(profile1)
+    columns2, kinds2 = _column_kinds(profile2)
+    symbols = {symbol for kind in kinds1 + kinds2 for symbol, _ in kind} - {gap}
+    _, _, table = alignment_scoring.encode_pair(
+        sorted(symbols), '', match_award, sub_penalty, sub_matrix)
+    index = {symbol: code for code, symbol in enumerate(sorted(symbols))}
+
+    def cost(a, b):
+        if a == gap:
+            return 0 if b == gap else indel_penalty
+        if b == gap:
+            return indel_penalty
+        return table[index[a]][index[b]]
+
+    pairs = len(profile1) * len(profile2)
+    kind_table = [
+        [sum(count1 * count2 * cost(a, b) for a, count1 in kind1 for b, count2 in kind2) / pairs
+         for kind2 in kinds2]
+        for kind1 in kinds1
+    ]
+    _, backpointers = alignment_compact._fill_full(columns1, columns2, kind_table, indel_penalty)
+
+    # Walk back to (0, 0), recording which column of each profile (or a gap) is used
+    used1 = []
+    used2 = []
+    i = len(columns1)
+    j = len(columns2)
+    direction = backpointers[i, j]
+    while direction != alignment_compact.START:
+        if direction != alignment_compact.LEFT:
+            i -= 1
+        if direction != alignment_compact.UP:
+            j -= 1
+        used1.append(i if direction != alignment_compact.LEFT else None)
+        used2.append(j if direction != alignment_compact.UP else None)
+        direction = backpointers[i, j]
+    used1.reverse()
+    used2.reverse()
+    return _spread(profile1, used1, gap) + _spread(profile2, used2, gap)
+
+
+def _column_kinds(profile: list[str]) -> tuple[list[int], list[tuple]]:
+    """Each column as the index of its symbol counts, and the distinct symbol counts"""
+    index = {}
+    columns = []
+    for column in zip(*profile):
+        kind = tuple(sorted(Counter(column).items()))
+        columns.append(index.setdefault(kind, len(index)))
+    return columns, list(index)
+
+
+def _spread(profile: list[str], used: list[int | None], gap: str) -> list[str]:
+    return [''.join(gap if c is None else row[c] for c in used) for row in profile]
+
+
+def align_multiple(sequences: list[str], match_award=-3, indel_penalty=5, sub_penalty=1,
+                   gap='-', sub_matrix=None, workers: int | None = None,
+                   cache: dict | None = None) -> list[str]:
+    """
+    Progressive multiple sequence alignment.
+
+    Every pair is scored in parallel (see pairwise_scores for reusing scores via cache),
+    a UPGMA guide tree is built from the resulting distances, and profiles are
+    aligned up the tree so the most similar sequences are aligned first.
+    Returns the aligned rows in the order of the input sequences.
+    """
+    sequences = [_as_str(seq) for seq in sequences]
+    if len(sequences) < 2:
+        return sequences
+    scores = pairwise_scores(sequences, match_award, indel_penalty, sub_penalty,
+                             sub_matrix, workers, cache)
+    tree = upgma(len(sequences), distances(sequences, scores, match_award, sub_penalty, sub_matrix))
+
+    def profile(tree) -> tuple[list[int], list[str]]:
+        if isinstance(tree, int):
+            return [tree], [sequences[tree]]
+        order1, rows1 = profile(tree[0])
+        order2, rows2 = profile(tree[1])
+        return order1 + order2, align_profiles(rows1, rows2, match_award, indel_penalty,
+                                               sub_penalty, gap, sub_matrix)
+
+    order, rows = profile(tree)
+    aligned = [''] * len(sequences)
+    for i, row in zip(order, rows):
+        aligned[i] = row
+    return aligned
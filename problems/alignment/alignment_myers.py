@@ -0,0 +1,43 @@
+def edit_distance(seq1, seq2) -> int:
+    """
+    Unit cost edit distance (match 0, substitution 1, insertion/deletion 1)
+    with Myers' bit-vector algorithm, in Hyyrö's formulation for global distance.
+
+    A whole DP column is held as two bit vectors of vertical +1 / -1 deltas,
+    one bit per character of the pattern, and is advanced by a handful of
+    integer operations per character of the text. Python ints are arbitrary
+    width, so the pattern does not have to fit in a machine word: each column
+    costs O(m / 64) word operations instead of O(m) Python steps.
+    """
+    # The longer sequence is the pattern: fewer (wider) iterations of the Python loop
+    if len(seq2) > len(seq1):
+        seq1, seq2 = seq2, seq1
+    m = len(seq1)
+    if m == 0:
+        return len(seq2)
+
+    match_masks = {}
+    for position, symbol in enumerate(seq1):
+        match_masks[symbol] = match_masks.get(symbol, 0) | 1 << position
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    plus_vertical = mask
+    minus_vertical = 0
+    distance = m
+    for symbol in seq2:
+        matches = match_masks.get(symbol, 0)
+        x_vertical = matches | minus_vertical
+        x_horizontal = (((matches & plus_vertical) + plus_vertical) ^ plus_vertical) | matches
+        plus_horizontal = minus_vertical | (~(x_horizontal | plus_vertical) & mask)
+        minus_horizontal = plus_vertical & x_horizontal
+        if plus_horizontal & last:
+            distance += 1
+        elif minus_horizontal & last:
+            distance -= 1
+        # The first row of a global alignment grows by one per column, so shift in a +1
+        plus_horizontal = (plus_horizontal << 1 | 1) & mask
+        minus_horizontal = (minus_horizontal << 1) & mask
+        plus_vertical = minus_horizontal | (~(x_vertical | plus_horizontal) & mask)
+        minus_vertical = plus_horizontal & x_vertical
+    return distance
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+import alignment_compact
+import alignment_scoring
+from alignment_compact import Backpointers, band_limits, DIAGONAL, LEFT, UP
+
+
+def _as_array(codes) -> np.ndarray:
+    if isinstance(codes, bytes):
+        return np.frombuffer(codes, dtype=np.uint8)
+    return np.array(codes, dtype=np.intp)
+
+
+def fill(seq1, seq2, match_award, indel_penalty, sub_penalty,
+         banded_width=-1, sub_matrix=None) -> tuple[float, Backpointers]:
+    """
+    Vectorized version of alignment_compact.fill, one row at a time.
+
+    The diagonal and up dependencies only reach into the previous row, so they
+    are plain array operations. The left dependency is resolved with a prefix min:
+    cur[j] = min(t[j], cur[j-1] + indel) is the same as
+    cur[j] - j * indel = cummin(t[j] - j * indel), where t = min(diagonal, up).
+    Directions are then recovered with the same diagonal, left, up tie-breaking.
+    That is only exact for integer costs (computed in int64); non-integer scoring
+    is filled by alignment_compact.fill instead.
+
+    Banded tables use the same band-only layout as alignment_compact,
+    so a row is 2k + 1 cells wide and cell (i, j) sits at offset j - i + k.
+    """
+    n = len(seq1)
+    m = len(seq2)
+    if banded_width >= max(n, m):
+        banded_width = -1
+    if banded_width != -1 and abs(n - m) > banded_width:
+        return math.inf, Backpointers(0, m + 1, banded_width)
+    codes1, codes2, table = alignment_scoring.encode_pair(
+        seq1, seq2, match_award, sub_penalty, sub_matrix)
+    if not all(float(x).is_integer() for x in (indel_penalty, *(c for row in table for c in row))):
+        # The ramp round trip below rounds float costs, so they would no longer tie
+        # (or compare) exactly like the sequential fill's
+        return alignment_compact.fill(seq1, seq2, match_award, indel_penalty, sub_penalty,
+                                      banded_width, sub_matrix=sub_matrix)
+
+    k = banded_width
+    backpointers = Backpointers(n + 1, m + 1, k)
+    width = backpointers.width
+    directions = np.frombuffer(backpointers.data, dtype=np.uint8).reshape(n + 1, width)
+
+    # Integer scoring stays exact in int64, with a large finite stand-in for inf
+    dtype = np.int64
+    inf = np.int64(1 << 60)
+    table = np.array(table, dtype=dtype).reshape(len(table), len(table))
+    codes2 = _as_array(codes2)
+    ramp = np.arange(width + 1, dtype=dtype) * indel_penalty
+    sub_rows = {}
+
+    # Unbanded rows are indexed by column (shift 0); banded rows by diagonal offset,
+    # so column j of row i is at j - shift and the previous row is `above` cells over.
+    prev = np.full(width + 1, inf, dtype=dtype)
+    _, hi = band_limits(0, m + 1, k)
+    shift = 0 if k == -1 else -k
+    above = 0 if k == -1 else 1
+    prev[-shift:hi - shift + 1] = ramp[:hi + 1]
+    directions[0, 1 - shift:hi - shift + 1] = LEFT
+
+    for i in range(1, n + 1):
+        if k != -1:
+            shift = i - k
+        cur = np.full(width + 1, inf, dtype=dtype)
+        lo, hi = band_limits(i, m + 1, k)
+        # start is the cost of the cell just left of the first computed cell
+        on_first_column = lo == 0
+        if on_first_column:
+            start = cur[-shift] = i * indel_penalty
+            directions[i, -shift] = UP
+            lo = 1
+        else:
+            start = inf
+        if lo > hi:
+            prev = cur
+            continue
+
+        a = codes1[i - 1]
+        if a not in sub_rows:
+            sub_rows[a] = table[a][codes2]
+
+        # Offsets of columns lo..hi in this row, and of their neighbours in the previous row
+        first = lo - shift
+        last = hi - shift + 1
+        diag = prev[first - 1 + above:last - 1 + above] + sub_rows[a][lo - 1:hi]
+        up = prev[first + above:last + above] + indel_penalty
+        best = np.minimum(diag, up)
+        best -= ramp[first:last]
+        if on_first_column:
+            best[0] = min(best[0], start - ramp[first - 1])
+        np.minimum.accumulate(best, out=best)
+        best += ramp[first:last]
+        cur[first:last] = best
+
+        left = np.empty_like(best)
+        left[0] = start
+        left[1:] = best[:-1]
+        left += indel_penalty
+        directions[i, first:last] = np.where(
+            diag == best, DIAGONAL, np.where(left == best, LEFT, UP))
+        prev = cur
+
+    cost = prev[m - shift]
+    if cost >= inf:
+        return math.inf, backpointers
+    return cost.item(), backpointers
@@ -0,0 +1,57 @@
+from typing import Mapping
+
+# A substitution matrix maps (a, b) pairs, or a -> b -> cost, to the cost of aligning a with b
+SubstitutionMatrix = Mapping
+
+
+def pair_costs(sub_matrix: SubstitutionMatrix | None) -> dict:
+    """Flatten a nested {a: {b: cost}} matrix into {(a, b): cost}"""
+    if not sub_matrix:
+        return {}
+    first = next(iter(sub_matrix.values()))
+    if isinstance(first, Mapping):
+        return {(a, b): cost for a, row in sub_matrix.items() for b, cost in row.items()}
+    return dict(sub_matrix)
+
+
+def transpose(sub_matrix: SubstitutionMatrix | None) -> dict | None:
+    """The matrix for aligning seq2 against seq1 instead of seq1 against seq2"""
+    if not sub_matrix:
+        return sub_matrix
+    return {(b, a): cost for (a, b), cost in pair_costs(sub_matrix).items()}
+
+
+def cheapest_substitution(match_award, sub_penalty, sub_matrix: SubstitutionMatrix | None) -> float:
+    return min(match_award, sub_penalty, *pair_costs(sub_matrix).values())
+
+
+def encode(seq, index: dict):
+    """
+    Translate seq into its symbol codes: bytes for small alphabets
+    (a single C-level translate), otherwise a list of ints
+    """
+    if len(index) <= 256:
+        if isinstance(seq, str):
+            return seq.translate({ord(c): chr(code) for c, code in index.items()}).encode('latin-1')
+        if isinstance(seq, (bytes, bytearray, memoryview)):
+            return bytes(seq).translate(bytes(index.get(b, 0) for b in range(256)))
+    return [index[c] for c in seq]
+
+
+def encode_pair(seq1, seq2, match_award, sub_penalty,
+                sub_matrix: SubstitutionMatrix | None = None) -> tuple:
+    """
+    Encode both sequences once into small integer codes and build the table
+    where table[code1][code2] is the cost of aligning the two symbols.
+
+    Pairs missing from sub_matrix cost match_award when the symbols are equal
+    and sub_penalty otherwise.
+    """
+    alphabet = sorted(set(seq1) | set(seq2))
+    index = {symbol: code for code, symbol in enumerate(alphabet)}
+    overrides = pair_costs(sub_matrix)
+    table = [
+        [overrides.get((a, b), match_award if a == b else sub_penalty) for b in alphabet]
+        for a in alphabet
+    ]
+    return encode(seq1, index), encode(seq2, index), table
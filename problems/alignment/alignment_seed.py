@@ -0,0 +1,133 @@
+from typing import NamedTuple
+
+from alignment import align
+
+
+class Anchor(NamedTuple):
+    """An exact match of seq1[start1:start1 + length] and seq2[start2:start2 + length]"""
+    start1: int
+    start2: int
+    length: int
+
+
+class SeedAlignment(NamedTuple):
+    score: float
+    aligned1: str
+    aligned2: str
+    anchors: list[Anchor]
+    # True whenever the anchors constrained the result
+    maybe_suboptimal: bool
+
+
+def find_anchors(seq1, seq2, k: int, max_occurrences: int) -> tuple[list[Anchor], bool]:
+    """
+    Exact k-mer hits of seq2 in seq1, merged along their diagonals into anchors.
+
+    k-mers that occur more than max_occurrences times in seq1 are ignored;
+    the second value says whether any hit was skipped for that reason.
+    """
+    index = {}
+    for i in range(len(seq1) - k + 1):
+        index.setdefault(seq1[i:i + k], []).append(i)
+
+    anchors = []
+    skipped_repeats = False
+    # diagonal (i - j) -> [start1, start2, end2] of the run currently being extended
+    runs = {}
+    for j in range(len(seq2) - k + 1):
+        positions = index.get(seq2[j:j + k])
+        if positions is None:
+            continue
+        if len(positions) > max_occurrences:
+            skipped_repeats = True
+            continue
+        for i in positions:
+            run = runs.get(i - j)
+            if run is not None and j <= run[2]:
+                run[2] = j + k
+            else:
+                if run is not None:
+                    anchors.append(Anchor(run[0], run[1], run[2] - run[1]))
+                runs[i - j] = [i, j, j + k]
+    for start1, start2, end2 in runs.values():
+        anchors.append(Anchor(start1, start2, end2 - start2))
+    return anchors, skipped_repeats
+
+
+def chain_anchors(anchors: list[Anchor], len1: int, len2: int, match_award=-3, indel_penalty=5,
+                  max_predecessors=50) -> list[Anchor]:
+    """
+    The colinear, non-overlapping chain of anchors with the best estimated cost,
+    or no anchors at all when no chain beats aligning without them.
+
+    Each anchored base saves |match_award|, and moving from one diagonal to another
+    costs at least one indel per diagonal crossed, including getting from (0, 0)
+    onto the first anchor's diagonal and from the last one to (len1, len2).
+    Anchors are sorted by position in seq1, and each one only looks back at the
+    previous max_predecessors anchors for its best predecessor, so chaining is
+    O(A * max_predecessors).
+    """
+    anchors = sorted(anchors)
+    gain = max(-match_award, 1)
+    end_diagonal = len1 - len2
+    best = [anchor.length * gain - abs(anchor.start1 - anchor.start2) * indel_penalty
+            for anchor in anchors]
+    previous = [-1] * len(anchors)
+    for n, anchor in enumerate(anchors):
+        diagonal = anchor.start1 - anchor.start2
+        for p in range(max(0, n - max_predecessors), n):
+            before = anchors[p]
+            if (before.start1 + before.length > anchor.start1
+                    or before.start2 + before.length > anchor.start2):
+                continue
+            shift = abs(before.start1 - before.start2 - diagonal)
+            score = best[p] + anchor.length * gain - shift * indel_penalty
+            if score > best[n]:
+                best[n] = score
+                previous[n] = p
+
+    # The empty chain still needs |len1 - len2| indels
+    best_score = -abs(end_diagonal) * indel_penalty
+    n = -1
+    for last, anchor in enumerate(anchors):
+        score = best[last] - abs(anchor.start1 - anchor.start2 - end_diagonal) * indel_penalty
+        if score > best_score:
+            best_score = score
+            n = last
+    chain = []
+    while n != -1:
+        chain.append(anchors[n])
+        n = previous[n]
+    return chain[::-1]
+
+
+def seed_and_extend(seq1: str, seq2: str, k=11, max_occurrences=8, match_award=-3,
+                    indel_penalty=5, sub_penalty=1, banded_width=8, gap='-') -> SeedAlignment:
+    """
+    Heuristic global alignment for long, similar sequences.
+
+    Exact k-mer seeds are found with a hash index of seq1 and merged into diagonal
+    anchors, and the best colinear chain of anchors is kept. Only the stretches
+    between consecutive anchors are aligned, each with align(mode='adaptive')
+    starting from banded_width, so every gap is aligned optimally on its own.
+    The result is optimal whenever an optimal alignment passes through the anchors.
+    """
+    anchors, _ = find_anchors(seq1, seq2, k, max_occurrences)
+    chain = chain_anchors(anchors, len(seq1), len(seq2), match_award, indel_penalty)
+
+    score = 0
+    aligned1 = []
+    aligned2 = []
+    end1 = end2 = 0
+    for start1, start2, length in [*chain, Anchor(len(seq1), len(seq2), 0)]:
+        cost, gap1, gap2 = align(seq1[end1:start1], seq2[end2:start2], match_award,
+                                 indel_penalty, sub_penalty, banded_width, gap, mode='adaptive')
+        score += cost + length * match_award
+        aligned1 += [gap1, seq1[start1:start1 + length]]
+        aligned2 += [gap2, seq2[start2:start2 + length]]
+        end1 = start1 + length
+        end2 = start2 + length
+
+    # Even a chain of every anchor can force a worse alignment than the optimum
+    maybe_suboptimal = bool(chain)
+    return SeedAlignment(score, ''.join(aligned1), ''.join(aligned2), chain, maybe_suboptimal)
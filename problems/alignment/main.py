@@ -1,34 +1,128 @@
+import time
 from argparse import ArgumentParser
+from itertools import combinations, product
 from pathlib import Path
 
-from alignment import align
+from alignment import align, align_many
+from alignment_fasta import Record, read_records
 
 
-def main(seq1: str, seq2: str):
+def main(seq1: str, seq2: str, **kwargs):
     """
     Align the two sequences and print the score and alignment strings
     """
-    score, alignment1, alignment2 = align(seq1, seq2)
+    score, alignment1, alignment2 = align(seq1, seq2, **kwargs)
     print(f'Score: {score}')
     print(alignment1)
     print(alignment2)
 
 
-def _content_or_string(could_be_path):
-    if (s1file := Path(could_be_path)).exists():
-        return s1file.read_text()
+def main_records(records1: list[Record], records2: list[Record] | None = None,
+                 workers: int | None = None, io_time: float | None = None, **kwargs):
+    """
+    Align every pair of records and print each result as soon as it is ready.
+    With only records1, every pair within it is aligned;
+    otherwise every record of records1 is aligned against every record of records2.
+
+    Passing io_time (the time it took to read the records) profiles each
+    alignment and prints its AlignmentStats.
+    """
+    if records2 is None:
+        pairs = list(combinations(records1, 2))
+    else:
+        pairs = list(product(records1, records2))
+    if io_time is not None:
+        kwargs['profile'] = True
+    results = align_many(((r1.sequence, r2.sequence) for r1, r2 in pairs), workers=workers, **kwargs)
+    for (r1, r2), (score, alignment1, alignment2, *stats) in zip(pairs, results):
+        print(f'>{r1.name} vs {r2.name}')
+        print(f'Score: {score}')
+        print(alignment1)
+        print(alignment2, flush=True)
+        if stats:
+            stats[0].io_time = io_time
+            print(stats[0], flush=True)
+
+
+def main_multiple(records: list[Record], workers: int | None = None):
+    """Progressively align all of the records together and print the aligned rows"""
+    from alignment_msa import align_multiple
+    for record, row in zip(records, align_multiple([r.sequence for r in records], workers=workers)):
+        print(f'>{record.name}')
+        print(row, flush=True)
+
+
+def main_checkpointed(seq1, seq2, checkpoint_dir: Path, every: int, **kwargs):
+    """Like main, saving progress to checkpoint_dir so a killed run can be resumed"""
+    from alignment_checkpoint import align_checkpointed
+    score, alignment1, alignment2 = align_checkpointed(seq1, seq2, checkpoint_dir, every=every, **kwargs)
+    print(f'Score: {score}')
+    print(alignment1)
+    print(alignment2)
+
+
+def main_resume(checkpoint_dir: Path):
+    """Finish the alignment checkpointed in checkpoint_dir and print it"""
+    from alignment_checkpoint import resume
+    score, alignment1, alignment2 = resume(checkpoint_dir)
+    print(f'Score: {score}')
+    print(alignment1)
+    print(alignment2)
+
+
+def demo():
+    """A small example alignment, unbanded and then with a band of 3"""
+    main('ctgcataaggtcagtcat', 'tacgcaggtcacggt')
+    main('ctgcataaggtcagtcat', 'tacgcaggtcacggt', banded_width=3)
+
+
+def _records_or_string(could_be_path, name) -> list[Record]:
+    if Path(could_be_path).exists():
+        return list(read_records(could_be_path))
     else:
         # assume it's the sequence string, not a file name
-        return could_be_path
+        return [Record(name, could_be_path.encode())]
 
 
 if __name__ == '__main__':
     parser = ArgumentParser()
-    parser.add_argument('seq1_file', help='Path to file containing sequence 1')
-    parser.add_argument('seq2_file', help='Path to file containing sequence 2')
+    parser.add_argument('seq1_file', nargs='?',
+                        help='Path to a FASTA/FASTQ/plain file, or a sequence')
+    parser.add_argument('seq2_file', nargs='?',
+                        help='Path to a FASTA/FASTQ/plain file, or a sequence. '
+                             'Without it, every pair of records in seq1_file is aligned')
+    parser.add_argument('--banded-width', type=int, default=-1, help='Band width, -1 for unbanded')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--msa', action='store_true',
+                        help='Align all records of seq1_file (and seq2_file) into one multiple alignment')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print the time spent reading input, filling and tracing back')
+    parser.add_argument('--checkpoint', type=Path,
+                        help='Save progress of a single pair alignment to this directory')
+    parser.add_argument('--checkpoint-every', type=int, default=1000, help='Rows between checkpoints')
+    parser.add_argument('--resume', type=Path, help='Finish the alignment checkpointed in this directory')
+    parser.add_argument('--demo', action='store_true', help='Run a small example alignment')
     args = parser.parse_args()
 
-    seq1 = _content_or_string(args.seq1_file)
-    seq2 = _content_or_string(args.seq2_file)
-
-    main(seq1, seq2)
+    if args.demo:
+        demo()
+    elif args.resume is not None:
+        main_resume(args.resume)
+    elif args.seq1_file is None:
+        parser.error('seq1_file is required unless --demo or --resume is given')
+    else:
+        start = time.perf_counter()
+        records1 = _records_or_string(args.seq1_file, 'seq1')
+        records2 = None if args.seq2_file is None else _records_or_string(args.seq2_file, 'seq2')
+        io_time = time.perf_counter() - start
+        if args.msa:
+            main_multiple(records1 + (records2 or []), workers=args.workers)
+        elif args.checkpoint is not None:
+            pair = records1 + (records2 or [])
+            if len(pair) != 2:
+                parser.error('--checkpoint aligns exactly two records')
+            main_checkpointed(pair[0].sequence, pair[1].sequence, args.checkpoint,
+                              args.checkpoint_every, banded_width=args.banded_width)
+        else:
+            main_records(records1, records2, workers=args.workers, banded_width=args.banded_width,
+                         io_time=io_time if args.profile else None)
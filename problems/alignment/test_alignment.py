@@ -1,5 +1,9 @@
+import subprocess
+import sys
+import time
 from pathlib import Path
 
+import pytest
 from byu_pytest_utils import with_import, max_score, test_files
 
 from test_utils import timeout
@@ -118,4 +122,322 @@ def test_massive_dna_alignment_banded(align):
 
     assert score == -17380
     assert aseq1 == expected_align1
-    assert aseq2 == expected_align2
\ No newline at end of file
+    assert aseq2 == expected_align2
+
+@max_score(2)
+@with_import('alignment')
+def test_band_does_not_reach_end(align):
+    score, aseq1, aseq2 = align('ACGTACGT', 'ACG', banded_width=2)
+    assert score == float('inf')
+    assert aseq1 is None
+    assert aseq2 is None
+
+
+@max_score(5)
+@with_import('alignment')
+@timeout(60)
+def test_large_dna_alignment_linear_space(align):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+
+    score, aseq1, aseq2 = align(seq1, seq2, mode='linear_space')
+
+    assert score == -3666
+    assert aseq1.replace('-', '') == seq1
+    assert aseq2.replace('-', '') == seq2
+    assert len(aseq1) == len(aseq2)
+
+
+@max_score(3)
+@with_import('alignment')
+def test_alignment_score(alignment_score):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+
+    assert alignment_score('polynomial', 'exponential') == -1
+    assert alignment_score(seq1, seq2, banded_width=3) == -2735
+    assert alignment_score('GGGGTTTTAAAACCCCTTTT', 'TTTTAAAACCCCTTTTGGGG', banded_width=2) == 6
+
+
+@max_score(5)
+@with_import('alignment')
+@timeout(20)
+def test_large_dna_alignment_numpy(align):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+
+    score, aseq1, aseq2 = align(seq1, seq2, engine='numpy')
+
+    expected_align1 = (test_files / 'large_bovine_murine_align1.txt').read_text()
+    expected_align2 = (test_files / 'large_bovine_murine_align2.txt').read_text()
+
+    assert score == -3666
+    assert aseq1 == expected_align1
+    assert aseq2 == expected_align2
+
+
+@max_score(2)
+@with_import('alignment')
+def test_float_scoring_numpy(align):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:200]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:200]
+
+    assert align('AAGA', 'CAAA', -0.3, 0.7, 0.1, banded_width=4, engine='numpy') == \
+        align('AAGA', 'CAAA', -0.3, 0.7, 0.1, banded_width=4)
+    assert align(seq1, seq2, -0.3, 0.7, 0.1, engine='numpy') == align(seq1, seq2, -0.3, 0.7, 0.1)
+
+
+@max_score(3)
+@with_import('alignment')
+@timeout(60)
+def test_align_many(align_many):
+    pairs = [
+        ('polynomial', 'exponential'),
+        ('ATGCATGC', 'ATGGTGC'),
+        ('ATATATATAT', 'TATATATATA'),
+        ('GGGGTTTTAAAACCCCTTTT', 'TTTTAAAACCCCTTTTGGGG'),
+    ] * 5
+
+    results = list(align_many(pairs, workers=2, banded_width=2))
+
+    assert [score for score, _, _ in results] == [-1, -12, -17, 6] * 5
+    assert results[3][1] == 'GGGGTTTTAAAACCCCTT--TT'
+
+
+@max_score(2)
+@with_import('alignment_compact')
+def test_banded_storage_is_band_only(fill):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:31000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:31000]
+
+    score, backpointers = fill(seq1, seq2, -3, 5, 1, banded_width=3)
+
+    assert score == -17380
+    assert len(backpointers.data) == (len(seq1) + 1) * 7
+
+
+@max_score(3)
+@with_import('alignment')
+def test_small_dna_alignment_adaptive_band(align):
+    score, aseq1, aseq2 = align('GGGGTTTTAAAACCCCTTTT', 'TTTTAAAACCCCTTTTGGGG', banded_width=2, mode='adaptive')
+    assert score == -8
+    assert aseq1 == 'GGGGTTTTAAAACCCCTTTT----'
+    assert aseq2 == '----TTTTAAAACCCCTTTTGGGG'
+
+
+@max_score(3)
+@with_import('alignment')
+def test_affine_gap_alignment(align):
+    score, aseq1, aseq2 = align('ACGTGTCAACGT', 'ACGTCGT', gap_open=4)
+    assert score == 8
+    assert aseq1 == 'ACGTGTCAACGT'
+    assert aseq2 == 'ACGT-----CGT'
+
+    score, aseq1, aseq2 = align('AAAGGGTTT', 'AAATTT', gap_open=4, banded_width=3)
+    assert score == 1
+    assert aseq1 == 'AAAGGGTTT'
+    assert aseq2 == 'AAA---TTT'
+
+
+@max_score(3)
+@with_import('alignment')
+def test_substitution_matrix(align):
+    # Transitions (purine <-> purine, pyrimidine <-> pyrimidine) are cheaper than transversions
+    purines = 'AG'
+    dna_matrix = {
+        (a, b): -3 if a == b else 0 if (a in purines) == (b in purines) else 2
+        for a in 'ACGT' for b in 'ACGT'
+    }
+
+    score, aseq1, aseq2 = align('ACGTTA', 'GCGTCA', sub_matrix=dna_matrix)
+    assert score == -12
+    assert aseq1 == 'ACGTTA'
+    assert aseq2 == 'GCGTCA'
+
+    score, _, _ = align('ACGTTA', 'TCGTGA', sub_matrix=dna_matrix)
+    assert score == -8
+
+
+@max_score(1)
+@with_import('alignment')
+def test_find_alignment_strings_dict_matrix(find_alignment_strings):
+    matrix = {
+        (0, 0): (0, None, None),
+        (0, 1): (5, (0, 0), 'left'),
+        (1, 1): (2, (0, 1), 'up'),
+        (1, 2): (-1, (0, 1), 'diagonal'),
+    }
+    assert find_alignment_strings(matrix, 'A', 'CA', '-') == ('-A', 'CA')
+
+
+@max_score(1)
+def test_import_is_quiet_and_lazy():
+    code = 'import sys, alignment; print(sorted(m for m in sys.modules if m.startswith("alignment")))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=Path(__file__).parent)
+    assert result.stdout.strip() == "['alignment']"
+
+
+@max_score(2)
+@with_import('alignment_fasta')
+def test_read_records(read_records, tmp_path):
+    fasta = tmp_path / 'reads.fa'
+    fasta.write_text('>first read\nACGT\nAC\n>second\nGGTT\r\n\n>third\nTTTT\n')
+    fastq = tmp_path / 'reads.fq'
+    fastq.write_text('@q1\nACGT\n+\nIIII\n@q2\nAGGT\n+q2\n@III\n')
+
+    assert [(r.name, bytes(r.sequence)) for r in read_records(fasta)] == [
+        ('first read', b'ACGTAC'), ('second', b'GGTT'), ('third', b'TTTT')]
+    assert [(r.name, bytes(r.sequence)) for r in read_records(fastq)] == [
+        ('q1', b'ACGT'), ('q2', b'AGGT')]
+
+    fasta.write_text('\n>s1\nACGT\n>s2\nGG\n')
+    assert [(r.name, bytes(r.sequence)) for r in read_records(fasta)] == [('s1', b'ACGT'), ('s2', b'GG')]
+    fastq.write_text('@q1\nACGT\n+\nII\n')
+    with pytest.raises(ValueError, match='q1'):
+        list(read_records(fastq))
+
+    [plain] = read_records(test_files / 'bovine_coronavirus.txt')
+    assert bytes(plain.sequence).decode() == read_sequence(test_files / 'bovine_coronavirus.txt')
+
+
+@max_score(3)
+@with_import('alignment')
+def test_local_alignment(align_local):
+    result = align_local('TTTTACGTACGGGG', 'CCACGTACCC')
+    assert result.score == -18
+    assert result.aligned1 == result.aligned2 == 'ACGTAC'
+    assert (result.start1, result.end1, result.start2, result.end2) == (4, 10, 2, 8)
+
+
+@max_score(3)
+@with_import('alignment')
+def test_semi_global_alignment(align_semi_global):
+    genome = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    read = genome[1200:1260]
+    read = read[:30] + read[31:]  # one deletion
+
+    result = align_semi_global(genome, read)
+
+    assert result.score == -3 * 59 + 5
+    assert (result.start1, result.end1) == (1200, 1260)
+    assert (result.start2, result.end2) == (0, 59)
+
+
+@max_score(3)
+@with_import('alignment')
+@timeout(5)
+def test_unit_cost_alignment_score(alignment_score):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')
+
+    assert alignment_score('kitten', 'sitting', match_award=0, indel_penalty=1, sub_penalty=1) == 3
+    assert alignment_score(seq1[:3000], seq2[:3000], match_award=0, indel_penalty=1, sub_penalty=1) == 1186
+    assert alignment_score(seq1, seq2, match_award=0, indel_penalty=2, sub_penalty=2) == 2 * 8486
+
+
+@max_score(3)
+@with_import('alignment_seed')
+@timeout(20)
+def test_seed_and_extend(seed_and_extend):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+
+    result = seed_and_extend(seq1, seq2)
+
+    assert result.score == -3666
+    assert result.aligned1.replace('-', '') == seq1
+    assert result.aligned2.replace('-', '') == seq2
+    assert result.anchors
+    assert result.maybe_suboptimal
+
+
+@max_score(2)
+@with_import('alignment_seed')
+def test_seed_and_extend_ignores_stray_anchor(seed_and_extend):
+    # The only k-mer hit is 300 diagonals away from both corners of the matrix
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:311]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[3000:3300] + seq1[:11]
+
+    result = seed_and_extend(seq1, seq2)
+
+    assert result.score == -139
+    assert result.anchors == []
+    assert not result.maybe_suboptimal
+
+
+@max_score(3)
+@with_import('alignment_msa')
+@timeout(30)
+def test_multiple_alignment(align_multiple):
+    assert align_multiple(['polynomial', 'exponential'], workers=1) == ['polyn-omial', 'exponential']
+
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:300]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:300]
+    sequences = [seq1, seq2, seq1[:150] + seq1[160:], seq2[20:]]
+    cache = {}
+
+    aligned = align_multiple(sequences, workers=2, cache=cache)
+
+    assert len({len(row) for row in aligned}) == 1
+    assert [row.replace('-', '') for row in aligned] == sequences
+    assert len(cache) == 6
+
+
+@max_score(3)
+@with_import('alignment_checkpoint')
+@timeout(60)
+def test_resume_after_preemption(resume, tmp_path):
+    checkpoint = tmp_path / 'checkpoint'
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+    code = (f'import alignment_checkpoint; '
+            f'alignment_checkpoint.align_checkpointed({seq1!r}, {seq2!r}, {str(checkpoint)!r}, every=100)')
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=Path(__file__).parent)
+    state = checkpoint / 'state.json'
+    try:
+        while not (state.exists() and '"row": 0' not in state.read_text()):
+            assert process.poll() is None
+            time.sleep(0.01)
+    finally:
+        process.kill()
+        process.wait()
+
+    score, aseq1, aseq2 = resume(checkpoint)
+
+    assert score == -3666
+    assert aseq1 == (test_files / 'large_bovine_murine_align1.txt').read_text()
+    assert aseq2 == (test_files / 'large_bovine_murine_align2.txt').read_text()
+    assert not checkpoint.exists()
+
+
+@max_score(3)
+@with_import('alignment_incremental')
+@timeout(20)
+def test_incremental_realignment(IncrementalAligner):
+    seq1 = read_sequence(test_files / 'bovine_coronavirus.txt')[:3000]
+    seq2 = read_sequence(test_files / 'murine_hepatitus.txt')[:3000]
+
+    aligner = IncrementalAligner(seq1[:2900] + 'ttttt' + seq1[2950:], seq2, stride=100)
+    score, aseq1, aseq2 = aligner.update(seq1)
+
+    assert aligner.rows_computed == 100
+    assert score == -3666
+    assert aseq1 == (test_files / 'large_bovine_murine_align1.txt').read_text()
+    assert aseq2 == (test_files / 'large_bovine_murine_align2.txt').read_text()
+
+
+@max_score(2)
+@with_import('alignment')
+def test_profiled_alignment(align):
+    score, aseq1, aseq2, stats = align('polynomial', 'exponential', profile=True)
+    assert (score, aseq1, aseq2) == (-1, 'polyn-omial', 'exponential')
+    assert stats.cells == 11 * 12
+    assert stats.band_occupancy == 1
+    assert stats.fill_time > 0 and stats.traceback_time > 0
+    assert stats.peak_memory is None
+
+    *_, stats = align('ATGCATGC', 'ATGGTGC', banded_width=1, profile='memory')
+    assert stats.cells == 2 + 6 * 3 + 2 + 1
+    assert 0 < stats.band_occupancy < 1
+    assert stats.peak_memory > 0
@@ -29,9 +29,9 @@ class MyThread(threading.Thread):
 def timeout(timer):
     def decorator(func):
         @wraps(func)
-        def new_func(*args):
+        def new_func(*args, **kwargs):
             # Create a thread to run the test
-            test_thread = MyThread(target=lambda: func(*args))
+            test_thread = MyThread(target=lambda: func(*args, **kwargs))
             test_thread.daemon = True
             test_thread.start()
 
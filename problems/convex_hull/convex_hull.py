@@ -1,132 +1,262 @@
+import operator
+from array import array
+from fractions import Fraction
+
 # Uncomment this line to import some functions that can help
 # you debug your algorithm
 # from plotting import draw_line, draw_hull, circle_point
 
-class Node:
-    def __init__(self, coordinates:tuple[float, float]):
-        self.coordinates = coordinates
-        self.clockwise = None
-        self.counterclockwise = None
+# Relative error bound of the floating point orientation determinant (Shewchuk's ccwerrboundA)
+ORIENTATION_ERROR = (3 + 16 * 2 ** -53) * 2 ** -53
+
 
-    def add_clockwise(self, node: 'Node'):
-        self.clockwise = node
-        node.counterclockwise = self
+def orientation(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """
+    Positive if a, b, c turn counterclockwise, negative if clockwise, zero if collinear.
 
-    def add_counterclockwise(self, node: 'Node'):
-        self.counterclockwise = node
-        node.clockwise = self
+    The determinant is computed in floating point, and only when it is too close
+    to zero for its sign to be trusted is it recomputed exactly with Fractions.
+    """
+    abx, aby, acx, acy = bx - ax, by - ay, cx - ax, cy - ay
+    left = abx * acy
+    right = aby * acx
+    det = left - right
+    if abs(det) > ORIENTATION_ERROR * (abs(left) + abs(right)):
+        return det
+    if (abx == 0 or acy == 0) and (aby == 0 or acx == 0):
+        # Both products are exactly zero, as on axis-aligned lines
+        return 0
+    exact = ((Fraction(bx) - Fraction(ax)) * (Fraction(cy) - Fraction(ay))
+             - (Fraction(by) - Fraction(ay)) * (Fraction(cx) - Fraction(ax)))
+    return (exact > 0) - (exact < 0)
 
-def slope(left: Node, right: Node) -> float:
-    return ((right.coordinates[1] - left.coordinates[1])
-            / (right.coordinates[0] - left.coordinates[0]))
 
 class Hull:
-    def __init__(self, coordinates:tuple[float, float]):
-        node: Node = Node(coordinates)
-        node.clockwise = node
-        node.counterclockwise = node
-        self.rightmost = node
-        self.leftmost = node
-
-    def join_two_nodes(self, right_hull: 'Hull'):
-        """Only use when joining two hulls that both only have one node each"""
-        self.rightmost.add_clockwise(right_hull.leftmost)
-        self.rightmost.add_counterclockwise(right_hull.leftmost)
-        self.rightmost = right_hull.rightmost
-
-    def hull_join(self, right_hull: 'Hull'):
-        ul, ur = self.set_upper_tangent(right_hull)
-        ll, lr = self.set_lower_tangent(right_hull)
-        ul.add_clockwise(ur)
-        ll.add_counterclockwise(lr)
-        self.rightmost = right_hull.rightmost
-
-    def set_upper_tangent(self, right_hull: 'Hull') -> (Node, Node):
-        l = self.rightmost
-        r = right_hull.leftmost
-        tan = slope(l,r)
+    """
+    The points of a divide and conquer hull computation in parallel arrays:
+    x/y coordinates in array('d'), and the clockwise and counterclockwise
+    neighbour of each point as an index into the same arrays.
+
+    Every point starts as a hull of its own (linked to itself), and joining
+    neighbouring hulls only relinks indices, so a point costs 24 bytes
+    instead of a Node object and its coordinates tuple.
+    """
+
+    def __init__(self, sorted_points: list[tuple[float, float]]):
+        n = len(sorted_points)
+        self.x = array('d', [point[0] for point in sorted_points])
+        self.y = array('d', [point[1] for point in sorted_points])
+        self.clockwise = array('i', range(n))
+        self.counterclockwise = array('i', range(n))
+        # Every coordinate difference is at most the width or height of the points,
+        # so no orientation determinant of them has a larger rounding error than this
+        width = max(self.x, default=0) - min(self.x, default=0)
+        height = max(self.y, default=0) - min(self.y, default=0)
+        self.error_bound = ORIENTATION_ERROR * 2 * width * height * (1 + 2 ** -50)
+
+    def add_clockwise(self, node: int, following: int):
+        self.clockwise[node] = following
+        self.counterclockwise[following] = node
+
+    def hull_join(self, left_rightmost: int, right_leftmost: int):
+        """Join two hulls, given by the rightmost point of the left one and the leftmost of the right one"""
+        ul, ur = self.set_upper_tangent(left_rightmost, right_leftmost)
+        ll, lr = self.set_lower_tangent(left_rightmost, right_leftmost)
+        self.add_clockwise(ul, ur)
+        self.add_clockwise(lr, ll)
+
+    def set_upper_tangent(self, left_rightmost: int, right_leftmost: int) -> (int, int):
+        """
+        The orientation tests are inlined, and their sign is trusted whenever it is
+        bigger than self.error_bound; only otherwise does is_outside settle it exactly.
+        """
+        x, y = self.x, self.y
+        clockwise, counterclockwise = self.clockwise, self.counterclockwise
+        bound = self.error_bound
+        l = left_rightmost
+        r = right_leftmost
         done = False
         while not done:
             done = True
+            # Coordinates relative to the end of the tangent that is not walking
+            rx, ry = x[r], y[r]
+            dx, dy = x[l] - rx, y[l] - ry
             while True:
-                if l.counterclockwise == self.rightmost:
+                candidate = counterclockwise[l]
+                if candidate == left_rightmost:
                     break
-                temp = slope(l.counterclockwise, r)
-                if temp < tan:
-                    tan = temp
-                    l = l.counterclockwise
-                    done = False
-                else:
+                cx, cy = x[candidate] - rx, y[candidate] - ry
+                # Positive when the candidate is above the line from l to r
+                above = dy * cx - dx * cy
+                if above <= bound and (above < -bound or not self.is_outside(r, l, candidate, -1)):
                     break
+                l, dx, dy = candidate, cx, cy
+                done = False
+            lx, ly = x[l], y[l]
+            dx, dy = x[r] - lx, y[r] - ly
             while True:
-                if r.clockwise == right_hull.leftmost:
+                candidate = clockwise[r]
+                if candidate == right_leftmost:
                     break
-                temp = slope(l, r.clockwise)
-                if temp > tan:
-                    tan = temp
-                    r = r.clockwise
-                    done = False
-                else:
+                cx, cy = x[candidate] - lx, y[candidate] - ly
+                above = dx * cy - dy * cx
+                if above <= bound and (above < -bound or not self.is_outside(l, r, candidate, 1)):
                     break
+                r, dx, dy = candidate, cx, cy
+                done = False
         return l, r
 
-    def set_lower_tangent(self, right_hull: 'Hull') -> (Node, Node):
-        l = self.rightmost
-        r = right_hull.leftmost
-        tan = slope(l,r)
+    def set_lower_tangent(self, left_rightmost: int, right_leftmost: int) -> (int, int):
+        x, y = self.x, self.y
+        clockwise, counterclockwise = self.clockwise, self.counterclockwise
+        bound = self.error_bound
+        l = left_rightmost
+        r = right_leftmost
         done = False
         while not done:
             done = True
+            rx, ry = x[r], y[r]
+            dx, dy = x[l] - rx, y[l] - ry
             while True:
-                if l.clockwise == self.rightmost:
+                candidate = clockwise[l]
+                if candidate == left_rightmost:
                     break
-                temp = slope(l.clockwise, r)
-                if temp > tan:
-                    tan = temp
-                    l = l.clockwise
-                    done = False
-                else:
+                cx, cy = x[candidate] - rx, y[candidate] - ry
+                # Positive when the candidate is below the line from l to r
+                below = dx * cy - dy * cx
+                if below <= bound and (below < -bound or not self.is_outside(r, l, candidate, 1)):
                     break
+                l, dx, dy = candidate, cx, cy
+                done = False
+            lx, ly = x[l], y[l]
+            dx, dy = x[r] - lx, y[r] - ly
             while True:
-                if r.counterclockwise == right_hull.leftmost:
+                candidate = counterclockwise[r]
+                if candidate == right_leftmost:
                     break
-                temp = slope(l, r.counterclockwise)
-                if temp < tan:
-                    tan = temp
-                    r = r.counterclockwise
-                    done = False
-                else:
+                cx, cy = x[candidate] - lx, y[candidate] - ly
+                below = dy * cx - dx * cy
+                if below <= bound and (below < -bound or not self.is_outside(l, r, candidate, -1)):
                     break
+                r, dx, dy = candidate, cx, cy
+                done = False
         return l, r
 
+    def is_outside(self, a: int, b: int, p: int, side: int) -> bool:
+        """
+        Whether point p is strictly to the left (side=1) or right (side=-1) of the
+        line from a to b, or on that line past b. Walking the tangent to such a p
+        keeps points on the tangent line (collinear points) out of the hull.
+        """
+        x, y = self.x, self.y
+        turn = orientation(x[a], y[a], x[b], y[b], x[p], y[p])
+        if turn:
+            return turn * side > 0
+        # Both products have the same sign for collinear points, so this sum is exact
+        return (x[p] - x[b]) * (x[b] - x[a]) + (y[p] - y[b]) * (y[b] - y[a]) > 0
+
+    def link_three(self, a: int, b: int, c: int):
+        """Link three sorted points into a clockwise cycle, or a segment if they are collinear"""
+        x, y = self.x, self.y
+        turn = (x[c] - x[a]) * (y[b] - y[a]) - (y[c] - y[a]) * (x[b] - x[a])
+        if -self.error_bound <= turn <= self.error_bound:
+            turn = orientation(x[a], y[a], x[c], y[c], x[b], y[b])
+        if turn == 0:
+            self.add_clockwise(a, c)
+            self.add_clockwise(c, a)
+            return
+        if turn < 0:
+            # The middle point is below the line from the first to the last
+            b, c = c, b
+        self.add_clockwise(a, b)
+        self.add_clockwise(b, c)
+        self.add_clockwise(c, a)
 
+    def indices(self, start: int = 0) -> list[int]:
+        """The points of the hull containing start, clockwise from start"""
+        hull = [start]
+        node = self.clockwise[start]
+        while node != start:
+            hull.append(node)
+            node = self.clockwise[node]
+        return hull
+
+
+
+def compute_hull(points: list[tuple[float, float]], backend: str = 'python',
+                 prefilter: bool = False) -> list[tuple[float, float]]:
+    """
+    Return the subset of provided points that define the convex hull,
+    clockwise from the leftmost point (the lowest one if several share the smallest x).
+    Duplicate points and points on a hull edge are not part of the hull.
+
+    backend='numpy' uses a vectorized monotone chain (see convex_hull_numpy) instead
+    of divide and conquer. It also accepts an (n, 2) ndarray, and then returns
+    the hull as an (h, 2) ndarray.
+
+    prefilter=True first discards the points strictly inside the Akl-Toussaint
+    octagon with NumPy, so sorting and merging only see the remaining candidates.
+    """
+    if prefilter:
+        from convex_hull_numpy import akl_toussaint
+        candidates = akl_toussaint(points)
+        if type(points).__module__ == 'numpy':
+            return compute_hull(points[candidates], backend)
+        return compute_hull([points[i] for i in candidates.tolist()], backend)
+    if backend == 'numpy':
+        from convex_hull_numpy import monotone_chain
+        hull = monotone_chain(points)
+        if type(points).__module__ == 'numpy':
+            return points[hull]
+        return [points[i] for i in hull.tolist()]
+    if backend != 'python':
+        raise ValueError(f'Unknown hull backend: {backend}')
 
-def compute_hull(points: list[tuple[float, float]]) -> list[tuple[float, float]]:
-    """Return the subset of provided points that define the convex hull"""
     sorted_points = sorted(points, key=lambda point: point[0])
-    hull: Hull = recursive_hull(sorted_points)
-    hull_list: list[tuple[float, float]] = []
-    hull_node: Node = hull.leftmost
-    hull_list.append(hull_node.coordinates)
-    while True:
-        hull_node = hull_node.clockwise
-        if hull_node == hull.leftmost:
-            break
-        else:
-            hull_list.append(hull_node.coordinates)
-    return hull_list
-
-def recursive_hull(points: list[tuple[float, float]]) -> Hull:
-    if len(points) == 1:
-        return Hull(points[0])
-    if len(points) == 2:
-        left_hull = recursive_hull([points[0]])
-        right_hull = recursive_hull([points[1]])
-        left_hull.join_two_nodes(right_hull)
-        return left_hull
-    else:
-        mid = len(points) // 2
-        left_hull = recursive_hull(points[:mid])
-        right_hull = recursive_hull(points[mid:])
-        left_hull.hull_join(right_hull)
-        return left_hull
+    hull = Hull(sorted_points)
+    if any(map(operator.eq, hull.x, hull.x[1:])):
+        # Equal x values are rare, so only then sort by (x, y) too,
+        # and keep only the first of any duplicate points
+        sorted_points = sorted(sorted_points, key=lambda point: (point[0], point[1]))
+        sorted_points = sorted_points[:1] + [
+            point for previous, point in zip(sorted_points, sorted_points[1:])
+            if point[0] != previous[0] or point[1] != previous[1]
+        ]
+        hull = Hull(sorted_points)
+    merge_hulls(hull)
+    return [sorted_points[i] for i in hull.indices(0)]
+
+def merge_hulls(hull: Hull) -> Hull:
+    """
+    Bottom-up divide and conquer over index ranges of the hull's points,
+    which must be distinct and sorted by (x, y).
+
+    The hull of points lo..hi - 1 always has lo as its leftmost
+    and hi - 1 as its rightmost point, so merging two neighbouring
+    ranges only needs those two indices: no slices, recursion or per-point objects.
+    Ranges of three points are linked directly, then ranges are merged as soon
+    as the one before is the same size (like a binary counter), which gives the
+    same balanced merges as recursing but while their points are still in cache.
+    The finished hull contains point 0.
+    """
+    n = len(hull.x)
+    # Start indices of the ranges that are not merged yet, left to right
+    starts = []
+    for lo in range(0, n, 3):
+        if lo + 3 <= n:
+            hull.link_three(lo, lo + 1, lo + 2)
+        elif lo + 2 == n:
+            # The last two points
+            hull.add_clockwise(lo, lo + 1)
+            hull.add_clockwise(lo + 1, lo)
+        starts.append(lo)
+        size = min(3, n - lo)
+        while len(starts) > 1 and lo - starts[-2] <= size:
+            hull.hull_join(lo - 1, lo)
+            starts.pop()
+            size += lo - starts[-1]
+            lo = starts[-1]
+
+    for lo in reversed(starts[1:]):
+        hull.hull_join(lo - 1, lo)
+    return hull
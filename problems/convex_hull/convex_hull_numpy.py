@@ -0,0 +1,112 @@
+import numpy as np
+
+from convex_hull import ORIENTATION_ERROR, orientation
+
+
+def monotone_chain(points: np.ndarray) -> np.ndarray:
+    """
+    Andrew's monotone chain over an (n, 2) array.
+    Returns the indices of the hull vertices, clockwise from the leftmost point
+    (the lowest one if several share the smallest x). Duplicate points and points
+    on a hull edge are left out.
+    """
+    points = np.asarray(points, dtype=float)
+    order = np.argsort(points[:, 0])
+    x = points[order, 0]
+    if np.any(x[1:] == x[:-1]):
+        # Only equal x values need the (much slower) two key sort
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        x = points[order, 0]
+    y = points[order, 1]
+    distinct = np.ones(len(order), dtype=bool)
+    distinct[1:] = (np.diff(x) != 0) | (np.diff(y) != 0)
+    order, x, y = order[distinct], x[distinct], y[distinct]
+    if len(order) < 3:
+        return order
+
+    # Which side of the line from the leftmost to the rightmost point each point is on
+    side = _cross(x[0], y[0], x[-1], y[-1], x, y)
+    ends = np.zeros(len(order), dtype=bool)
+    ends[[0, -1]] = True
+    upper = _chain(x, y, np.flatnonzero(ends | (side > 0)), 1)
+    lower = _chain(x, y, np.flatnonzero(ends | (side < 0)), -1)
+    return order[np.concatenate((upper, lower[-2:0:-1]))]
+
+
+def _chain(x: np.ndarray, y: np.ndarray, candidates: np.ndarray, turn: int) -> np.ndarray:
+    """
+    The upper (turn=1) or lower (turn=-1) hull of the x-sorted candidates, left to right.
+
+    Every middle point that does not turn the right way with its neighbours is
+    under (over) the segment joining them, so all such points are dropped at once
+    in one vectorized pass. Passes repeat until the chain is convex, or until
+    they stop paying off, when the usual stack finishes the few points left.
+    """
+    while len(candidates) > 2:
+        cx, cy = x[candidates], y[candidates]
+        cross = _cross(cx[:-2], cy[:-2], cx[1:-1], cy[1:-1], cx[2:], cy[2:])
+        keep = np.ones(len(candidates), dtype=bool)
+        keep[1:-1] = turn * cross < 0
+        removed = len(candidates) - np.count_nonzero(keep)
+        candidates = candidates[keep]
+        if removed == 0:
+            return candidates
+        if removed < len(candidates) // 8:
+            break
+
+    xs, ys = x[candidates].tolist(), y[candidates].tolist()
+    stack = []
+    for i in range(len(candidates)):
+        while len(stack) > 1:
+            a, b = stack[-2], stack[-1]
+            if turn * orientation(xs[a], ys[a], xs[b], ys[b], xs[i], ys[i]) < 0:
+                break
+            stack.pop()
+        stack.append(i)
+    return candidates[stack]
+
+
+def _cross(ax, ay, bx, by, cx, cy) -> np.ndarray:
+    """
+    (b - a) x (c - a) elementwise, recomputed with the exact orientation()
+    wherever floating point rounding could have given it the wrong sign
+    """
+    left = (bx - ax) * (cy - ay)
+    right = (by - ay) * (cx - ax)
+    cross = left - right
+    unsure = np.flatnonzero(np.abs(cross) <= ORIENTATION_ERROR * (np.abs(left) + np.abs(right)))
+    if len(unsure):
+        coordinates = [np.broadcast_to(v, cross.shape)[unsure].tolist() for v in (ax, ay, bx, by, cx, cy)]
+        cross[unsure] = [orientation(*point) for point in zip(*coordinates)]
+    return cross
+
+
+def akl_toussaint(points: np.ndarray) -> np.ndarray:
+    """
+    Indices of the points that can be on the hull: everything except the points
+    strictly inside the octagon of the extreme points in x, y, x + y and x - y.
+    For uniform, normal or circular clouds that leaves only a small fraction.
+    """
+    points = np.asarray(points, dtype=float)
+    x = points[:, 0]
+    y = points[:, 1]
+    if len(points) < 9:
+        return np.arange(len(points))
+    # The extreme points, counterclockwise starting from the leftmost
+    octagon = points[[
+        np.argmin(x), np.argmin(x + y), np.argmin(y), np.argmax(x - y),
+        np.argmax(x), np.argmax(x + y), np.argmax(y), np.argmin(x - y),
+    ]]
+    following = np.roll(octagon, -1, axis=0)
+    # Several directions can share an extreme point
+    edges = np.any(octagon != following, axis=1)
+    if np.count_nonzero(edges) < 3:
+        return np.arange(len(points))
+
+    inside = np.ones(len(points), dtype=bool)
+    for (x0, y0), (x1, y1) in zip(octagon[edges].tolist(), following[edges].tolist()):
+        left = (x1 - x0) * (y - y0)
+        right = (y1 - y0) * (x - x0)
+        # Points too close to an edge for the sign to be certain stay candidates
+        inside &= left - right > ORIENTATION_ERROR * (np.abs(left) + np.abs(right))
+    return np.flatnonzero(~inside)
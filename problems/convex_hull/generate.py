@@ -32,13 +32,4 @@ def generate_random_points(distribution: str, n: int, seed: int | None = None) -
     else:
         raise NotImplementedError(f'Random distribution of type: {distribution}')
 
-    # Generate points with unique x values
-    points = []
-    xs = set()
-    while len(points) < n:
-        point = rand_func()
-        if point[0] not in xs:
-            points.append(point)
-            xs.add(point[0])
-
-    return points
+    return [rand_func() for _ in range(n)]
@@ -6,12 +6,12 @@ from convex_hull import compute_hull
 from plotting import plot_points, draw_hull, title, show_plot
 
 
-def main(n: int, distribution: str, seed: int | None):
+def main(n: int, distribution: str, seed: int | None, backend: str = 'python', prefilter: bool = False):
     points = generate_random_points(distribution, n, seed)
     plot_points(points)
 
     start = time()
-    hull_points = compute_hull(points)
+    hull_points = compute_hull(points, backend, prefilter)
     end = time()
 
     draw_hull(hull_points)
@@ -33,6 +33,10 @@ if __name__ == '__main__':
                         default='uniform'
                         )
     parser.add_argument('--seed', type=int, default=None, help="Random seed")
+    parser.add_argument('--backend', choices=['python', 'numpy'], default='python',
+                        help='Divide and conquer in Python, or a NumPy monotone chain')
+    parser.add_argument('--prefilter', action='store_true',
+                        help='Drop points inside the Akl-Toussaint octagon before computing the hull')
     parser.add_argument('--debug', action='store_true', help='Turn on debug plotting')
     args = parser.parse_args()
 
@@ -46,4 +50,4 @@ if __name__ == '__main__':
         plt.ion()
     for i in [10,100,1000,10000, 100000, 500000, 1000000]:
         for j in range(5):
-            main(i, args.dist, args.seed)
+            main(i, args.dist, args.seed, args.backend, args.prefilter)
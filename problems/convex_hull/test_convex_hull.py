@@ -32,3 +32,34 @@ def test_guassian_distribution_large():
     points = generate_random_points('guassian', 20000, 312)
     candidate_hull = compute_hull(points)
     assert is_convex_hull(candidate_hull, points)
+
+
+@max_score(5)
+def test_numpy_backend():
+    import numpy as np
+
+    points = generate_random_points('uniform', 20000, 312)
+    assert compute_hull(points, backend='numpy') == compute_hull(points)
+
+    candidate_hull = compute_hull(np.array(points), backend='numpy')
+    assert is_convex_hull([tuple(point) for point in candidate_hull.tolist()], points)
+
+
+@max_score(5)
+def test_prefilter():
+    points = generate_random_points('guassian', 20000, 312)
+    expected = compute_hull(points)
+    assert compute_hull(points, prefilter=True) == expected
+    assert compute_hull(points, backend='numpy', prefilter=True) == expected
+
+
+@max_score(5)
+def test_duplicate_and_collinear_points():
+    grid = [(x, y) for x in range(10) for y in range(10)] * 2
+    assert compute_hull(grid) == [(0, 0), (0, 9), (9, 9), (9, 0)]
+    assert compute_hull(grid, backend='numpy') == [(0, 0), (0, 9), (9, 9), (9, 0)]
+
+    points = generate_random_points('uniform', 1000, 312)
+    points += points[:100] + [(0.5, y / 10) for y in range(10)]
+    candidate_hull = compute_hull(points)
+    assert is_convex_hull(candidate_hull, points)